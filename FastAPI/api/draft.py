@@ -1,13 +1,21 @@
 from datetime import datetime, timedelta
-from typing import List, Optional
-from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from typing import Any, Dict, List, Optional, Union
+from math import ceil
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect
+from utils.serialization import trusted
 from services.draft_manager import DraftManager
 from utils.db import get_database
 from pydantic import BaseModel
-from models import PyObjectId, Draft, NFLPlayer
+from models import PyObjectId, Draft, NFLPlayer, NFLPlayerSummary, NFLPlayerRoster, PlayerView, empty_roster, shape_player
 import random
+import json
 from typing import List
 from pymongo.errors import PyMongoError
+from services.roster_ownership import claim_player, is_player_owned, ownership_transaction
+from api.league import create_schedule
+from api.player import get_nfl_players_paginated
+from services.player_cache import load_players
+from utils.response_cache import invalidate_tags
 
 router = APIRouter()
 draft_manager = DraftManager()
@@ -27,7 +35,25 @@ async def websocket_endpoint(websocket: WebSocket, league_id: str):
     try:
         while True:
             data = await websocket.receive_text()
+            draft_manager.touch_client(websocket)
+
+            try:
+                message = json.loads(data)
+            except ValueError:
+                continue
+
+            # Reconnecting clients send {"type": "resync", "last_seq": n, "epoch": "..."}
+            if isinstance(message, dict) and message.get("type") == "resync":
+                last_seq = message.get("last_seq")
+                await draft_manager.resync_client(
+                    websocket,
+                    league_id,
+                    last_seq if isinstance(last_seq, int) else None,
+                    message.get("epoch")
+                )
     except WebSocketDisconnect:
+        pass
+    finally:
         await draft_manager.disconnect_client(websocket, league_id)
 
 @router.post("/leagues/{league_id}/teams/{team_id}/draft")
@@ -42,9 +68,10 @@ async def draft_player(league_id: str, team_id: str, player: PlayerDraft):
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid ID format")
     
+    touched = [f"team:{team_id}", f"league:{league_id}"]
     try:
         async with await db.client.start_session() as session:
-            async with session.start_transaction():
+            async with ownership_transaction(session):
                 # Fetch team details
                 team = await db.teams.find_one({"_id": object_team_id}, session=session)
                 if not team:
@@ -58,16 +85,15 @@ async def draft_player(league_id: str, team_id: str, player: PlayerDraft):
                 player_position = player_doc["position"]
                 
                 # Check roster constraints
-                roster = team.get("roster", [None] * 17)
+                roster = team.get("roster") or empty_roster()
                 
-                handle_roster = roster.copy()
-                # Fetch all player details for the roster
-                for i in range(len(handle_roster)):
-                    player_return = await db.nflplayers.find_one({"_id": handle_roster[i]}, session=session)
-                    if player_return != None:
-                        handle_roster[i] = player_return
-                    else:
-                        handle_roster[i] = None
+                # Check which slots hold real players with one $in query; empty slots are None
+                rostered_ids = [player_id for player_id in roster if player_id is not None]
+                rostered = set()
+                if rostered_ids:
+                    cursor = db.nflplayers.find({"_id": {"$in": rostered_ids}}, {"_id": 1}, session=session)
+                    rostered = {rostered_player["_id"] async for rostered_player in cursor}
+                handle_roster = [player_id if player_id in rostered else None for player_id in roster]
                 
                 # Find available slot for the player
                 slot_index = None
@@ -96,6 +122,9 @@ async def draft_player(league_id: str, team_id: str, player: PlayerDraft):
                 if slot_index is None:
                     raise HTTPException(status_code=400, detail="Team roster is full")
                 
+                # Claim the player first; the unique ownership index rejects double-rostering
+                await claim_player(league_id, object_player_id, object_team_id, session=session)
+
                 # Update the roster
                 roster[slot_index] = object_player_id
 
@@ -115,6 +144,7 @@ async def draft_player(league_id: str, team_id: str, player: PlayerDraft):
                     object_draft_id = PyObjectId(league["draft"])
                 except Exception:
                     raise HTTPException(status_code=400, detail="Invalid ID format")
+                touched.append(f"draft:{object_draft_id}")
                 draft = await db.drafts.find_one({"_id": object_draft_id}, session=session)
                 current_round = draft["current_round"]
                 current_pick = draft["current_pick"]
@@ -155,10 +185,7 @@ async def draft_player(league_id: str, team_id: str, player: PlayerDraft):
                         league_id
                     )
 
-                    d_id = league["draft"]
-                    if d_id in draft_manager.active_drafts:
-                        draft_manager.active_drafts[d_id].cancel()
-                        del draft_manager.active_drafts[d_id]
+                    await draft_manager.stop_draft_monitoring(str(league["draft"]), league_id)
                         
                     return {"message": f"Player successfully drafted to position {slot_index}"}
 
@@ -172,13 +199,16 @@ async def draft_player(league_id: str, team_id: str, player: PlayerDraft):
                 )
 
                 if current_round > draft["total_rounds"]:
-                    await draft_manager.stop_draft_monitoring(str(draft["_id"]))
+                    await draft_manager.stop_draft_monitoring(str(draft["_id"]), league_id)
                     return
 
+                draft_manager.mark_drafted(str(object_draft_id), object_player_id)
+
                 await draft_manager.broadcast(
                     {
                         "type": "player_drafted",
                         "player_id": str(player.player_id),
+                        "team_id": team_id,
                         "next_pick_time": str(next_pick_time),
                         "next_drafter": str(next_drafter)
                     },
@@ -188,7 +218,48 @@ async def draft_player(league_id: str, team_id: str, player: PlayerDraft):
                 return {"message": f"Player successfully drafted to position {slot_index}"}
     except PyMongoError as e:
         raise HTTPException(status_code=500, detail=f"Database error occurred: {str(e)}")
-
+    finally:
+        # Runs once the transaction has committed or aborted
+        await invalidate_tags(*touched)
+
+
+@router.get("/leagues/{league_id}/draft-board", response_model=Dict[str, Any])
+async def get_draft_board(
+    league_id: str,
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=100),
+    position: Optional[str] = None,
+    name: Optional[str] = None
+):
+    board = draft_manager.get_league_board(league_id)
+
+    if board is None:
+        # No live draft in this process; use the indexed availability query
+        db = get_database()
+        try:
+            object_league_id = PyObjectId(league_id)
+        except Exception:
+            raise HTTPException(status_code=400, detail="Invalid ID format")
+
+        league = await db.leagues.find_one({"_id": object_league_id}, {"_id": 1})
+        if not league:
+            raise HTTPException(status_code=404, detail="League not found")
+        return await get_nfl_players_paginated(
+            league_id, page=page, limit=limit, position=position, team=None, name=name,
+            available_in_league=league_id, cursor=None, keyset=False, include_total=True, view="roster"
+        )
+
+    players, total_players = board.page((page - 1) * limit, limit, position, name)
+
+    return trusted({
+        "players": [
+            {**shape_player(player, "roster"), "taken": not board.is_available(player["_id"])}
+            for player in players
+        ],
+        "page": page,
+        "total_pages": ceil(total_players / limit),
+        "total_players": total_players
+    })
 
 async def check_player_availability(league_id: str, player_id: str):
     db = get_database()
@@ -203,12 +274,7 @@ async def check_player_availability(league_id: str, player_id: str):
     if not league:
         raise HTTPException(status_code=404, detail="League not found")
     
-    teams_with_player = await db.teams.count_documents({
-        "league": league_object_id,
-        "roster": {"$in": [player_object_id]}
-    })
-    
-    if teams_with_player > 0:
+    if await is_player_owned(league_object_id, player_object_id):
         raise HTTPException(status_code=400, detail="Player already drafted or picked up in this league")
 
 @router.post("/drafts/{draft_id}/update-time", response_model=Draft)
@@ -270,6 +336,10 @@ async def wait_draft(draft_id: str):
         raise HTTPException(status_code=400, detail="Invalid draft ID format")
     
     league = await db.leagues.find_one({"_id": object_league_id})
+    if not league["schedule"]:
+        # Scheduling was deferred while the league was filling
+        await create_schedule(str(object_league_id))
+        await invalidate_tags(f"league:{object_league_id}")
     league_teams = league["teams"].copy()
     random.shuffle(league_teams)
     new_draft_order = league_teams
@@ -289,6 +359,7 @@ async def wait_draft(draft_id: str):
     if result.modified_count == 0:
         raise HTTPException(status_code=400, detail="Failed to wait the draft")
 
+    await invalidate_tags(f"draft:{draft_id}")
     await draft_manager.start_waiting_monitoring(draft_id, str(draft["league"]))
 
     await draft_manager.broadcast(
@@ -340,8 +411,8 @@ async def start_draft(draft_id: str):
     
     return Draft(**updated_draft)
 
-@router.get("/drafts/picks/{draft_id}", response_model=List[Optional[NFLPlayer]])
-async def get_draft_picks(draft_id: str):
+@router.get("/drafts/picks/{draft_id}", response_model=Union[List[Optional[NFLPlayerSummary]], List[Optional[NFLPlayerRoster]], List[Optional[NFLPlayer]]])
+async def get_draft_picks(draft_id: str, view: PlayerView = "full"):
     db = get_database()
     
     try:
@@ -373,19 +444,19 @@ async def get_draft_picks(draft_id: str):
     
     # Fetch all valid players in a single query
     if valid_ids:
-        cursor = db.nflplayers.find({"_id": {"$in": valid_ids}})
-        player_list = await cursor.to_list(length=None)
+        player_list = await load_players(valid_ids, view)
         players = {str(player["_id"]): player for player in player_list}
         
         # Place players in their correct positions
         for player_id, position in id_positions.items():
             if player_id in players:
                 # Add pick metadata to each player
-                player = players[player_id].copy()
+                player = shape_player(players[player_id], view)
                 team_count = len(draft["draft_order"])
                 player["round"] = (position // team_count) + 1
                 player["pick"] = (position % team_count) + 1
                 player["pick_number"] = position + 1
                 picks[position] = player
     
-    return picks
\ No newline at end of file
+    # Shaped to the view from our own documents, so skip response model validation
+    return trusted(picks)
\ No newline at end of file
@@ -1,14 +1,20 @@
+import asyncio
 from aiohttp import ClientSession
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
 from models.league import League
 from models.team import Team
 from utils.db import get_database
 from pydantic import BaseModel
-from models import PyObjectId, Matchup, Draft
+from models import PyObjectId, Matchup, Draft, empty_roster, shape_player
 from pymongo.errors import PyMongoError
-from bson.errors import InvalidId
+from services.roster_ownership import claim_player, is_player_owned, release_league, release_team, ownership_transaction
+from services.standings import get_league_standings, invalidate_standings
+from services.player_cache import load_players
+from utils.response_cache import invalidate_tags
+from utils.serialization import trusted
 from datetime import datetime, time, timezone
-from typing import Tuple
+from typing import List, Optional, Tuple
 
 router = APIRouter()
 
@@ -187,15 +193,12 @@ async def join_league(content: LeagueJoin):
                     session=session
                 )
 
-                updated_league = await create_schedule(str(content.league_id), session=session)
+                # create_schedule reads the league after the push, so its result is current
+                updated_league = await create_schedule(str(content.league_id), session=session, defer_until_full=True)
+                await invalidate_standings(content.league_id, session=session)
 
-                # Fetch the updated league to return
-                updated_league = await db.leagues.find_one({"_id": content.league_id}, session=session)
-
-                if updated_league is None:
-                    raise HTTPException(status_code=500, detail="Failed to update League")
-                
-                return League(**updated_league)
+        await invalidate_tags(f"league:{content.league_id}")
+        return updated_league
                 
     except PyMongoError as e:
         raise HTTPException(status_code=500, detail=f"Database error occurred: {str(e)}")
@@ -210,7 +213,30 @@ def calculate_nfl_weeks() -> Tuple[int, int]:
 
     return current_week, current_week
 
-async def create_schedule(league_id: str, session: ClientSession = None):
+def build_schedule(league_id: PyObjectId, teams: List[PyObjectId], weeks: List[int]) -> List[List[Matchup]]:
+    """Generate the round-robin for the given weeks in memory, one list of matchups per week"""
+    teams = teams.copy()
+    if len(teams) % 2 == 1:
+        teams.append(PyObjectId())  # Add bye week team if odd number
+    num_teams = len(teams)
+
+    schedule = []
+    for week_num in weeks:
+        # Rotate teams for variety in matchups
+        teams = [teams[0]] + [teams[-1]] + teams[1:-1]
+        schedule.append([
+            Matchup(
+                league=league_id,
+                week=week_num,  # Use actual NFL week number
+                team_a=teams[i],
+                team_b=teams[num_teams - i - 1]
+            )
+            for i in range(num_teams // 2)
+        ])
+    return schedule
+
+async def create_schedule(league_id: str, session: ClientSession = None, defer_until_full: bool = False):
+    """Replace a league's matchups with a fresh schedule using one delete and one insert"""
     db = get_database()
     
     try:
@@ -221,54 +247,21 @@ async def create_schedule(league_id: str, session: ClientSession = None):
     league = await db.leagues.find_one({"_id": object_id}, session=session)
     if not league:
         raise HTTPException(status_code=404, detail="League not found")
+
+    # Joins keep re-scheduling until the last team arrives; the draft builds it otherwise
+    if defer_until_full and len(league["teams"]) < league.get("number_of_players", 0):
+        return League(**league)
     
-    teams = league['teams']
-    if len(teams) % 2 == 1:
-        teams.append(PyObjectId())  # Add bye week team if odd number
-    num_teams = len(teams)
-    
-    # Delete existing matchups
-    matchups = league['schedule'].copy()
-    for week in matchups:
-        for matchup_id in week:
-            try:
-                await db.matchups.delete_one({"_id": PyObjectId(matchup_id)}, session=session)
-            except InvalidId:
-                print(f"Invalid matchup ID: {matchup_id}")
-            except PyMongoError as e:
-                print(f"Error deleting matchup {matchup_id}: {str(e)}")
-    
-    schedule = []
     current_week, _ = calculate_nfl_weeks()
     remaining_weeks = list(range(current_week + 1, 19))  # Weeks 9-18 if starting at week 9
-    
-    # Calculate how many rounds we need to repeat to fill the remaining weeks
-    base_schedule_rounds = num_teams - 1
-    num_remaining_weeks = len(remaining_weeks)
-    
-    # Generate unique matchups for each remaining week
-    teams_copy = teams.copy()
-    for week_num in remaining_weeks:
-        round_matches = []
-        
-        # Rotate teams for variety in matchups
-        teams_copy = [teams_copy[0]] + [teams_copy[-1]] + teams_copy[1:-1]
-        
-        # Create matchups for this week
-        for i in range(num_teams // 2):
-            team1 = teams_copy[i]
-            team2 = teams_copy[num_teams - i - 1]
-            
-            new_match = Matchup(
-                league=object_id,
-                week=week_num,  # Use actual NFL week number
-                team_a=team1,
-                team_b=team2
-            )
-            match_id = await db.matchups.insert_one(new_match.dict(by_alias=True), session=session)
-            round_matches.append(str(match_id.inserted_id))
-        
-        schedule.append(round_matches)
+    weeks = build_schedule(object_id, league["teams"], remaining_weeks)
+
+    await db.matchups.delete_many({"league": object_id}, session=session)
+
+    matchups = [matchup.dict(by_alias=True) for week in weeks for matchup in week]
+    if matchups:
+        await db.matchups.insert_many(matchups, session=session)
+    schedule = [[str(matchup.id) for matchup in week] for week in weeks]
     
     # Update the league with the new schedule
     update_result = await db.leagues.update_one(
@@ -277,11 +270,11 @@ async def create_schedule(league_id: str, session: ClientSession = None):
         session=session
     )
     
-    if update_result.modified_count == 0:
+    if update_result.matched_count == 0:
         raise HTTPException(status_code=500, detail="Failed to update League")
     
-    updated_league = await db.leagues.find_one({"_id": object_id}, session=session)
-    return League(**updated_league)
+    league["schedule"] = schedule
+    return League(**league)
 
 
 @router.get("/leagues/{league_id}", response_model=League)
@@ -299,6 +292,81 @@ async def get_league(league_id: str):
         return league
     raise HTTPException(status_code=404, detail="League not found")
 
+@router.get("/leagues/{league_id}/standings")
+async def get_standings(league_id: str):
+    try:
+        object_id = PyObjectId(league_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid league ID format")
+
+    standings = await get_league_standings(object_id)
+    if standings is None:
+        raise HTTPException(status_code=404, detail="League not found")
+    return {
+        "league": league_id,
+        "week": standings["week"],
+        "teams": [
+            {**entry, "team": str(entry["team"])}
+            for entry in standings["teams"]
+        ],
+        "updated_at": standings["updated_at"]
+    }
+
+@router.get("/leagues/{league_id}/dashboard")
+async def get_league_dashboard(league_id: str, week: Optional[int] = Query(None, ge=1, le=18)):
+    """League, teams, owners, a week's matchups with rosters and standings in one payload"""
+    db = get_database()
+
+    try:
+        object_id = PyObjectId(league_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid league ID format")
+
+    league = await db.leagues.find_one({"_id": object_id})
+    if not league:
+        raise HTTPException(status_code=404, detail="League not found")
+    week = week or league["week"]
+
+    teams, matchups, standings = await asyncio.gather(
+        db.teams.find({"_id": {"$in": league["teams"]}}).to_list(None),
+        db.matchups.find({"league": object_id, "week": week}).to_list(None),
+        get_league_standings(object_id)
+    )
+    if standings is None:
+        raise HTTPException(status_code=404, detail="League not found")
+
+    owner_ids = list({team["owner"] for team in teams})
+    player_ids = list({
+        player_id
+        for matchup in matchups
+        for player_id in matchup["team_a_roster"] + matchup["team_b_roster"]
+        if player_id is not None
+    })
+    owners, players = await asyncio.gather(
+        db.users.find({"_id": {"$in": owner_ids}}, {"username": 1, "name": 1}).to_list(None),
+        load_players(player_ids, "roster")
+    )
+    players = {player["_id"]: shape_player(player, "roster") for player in players}
+
+    def roster(player_ids: list) -> list:
+        return [players.get(player_id) if player_id is not None else None for player_id in player_ids]
+
+    return trusted({
+        "league": jsonable_encoder(League(**league)),
+        "week": week,
+        "teams": {str(team["_id"]): jsonable_encoder(Team(**team)) for team in teams},
+        "owners": {str(owner["_id"]): {"username": owner["username"], "name": owner["name"]} for owner in owners},
+        "matchups": [
+            {
+                **jsonable_encoder(Matchup(**matchup)),
+                "team_a_roster": roster(matchup["team_a_roster"]),
+                "team_b_roster": roster(matchup["team_b_roster"])
+            }
+            for matchup in matchups
+        ],
+        "standings": [{**entry, "team": str(entry["team"])} for entry in standings["teams"]]
+    })
+
 @router.delete("/leagues/{league_id}", response_model=dict)
 async def delete_league(league_id: str):
     db = get_database()
@@ -338,6 +406,7 @@ async def add_team_to_league(league_id: str, team: TeamAdd):
     if result.modified_count == 0:
         raise HTTPException(status_code=500, detail="Failed to add team to league")
 
+    await invalidate_tags(f"league:{league_id}")
     updated_league = await db.leagues.find_one({"_id": object_id})
     return League(**updated_league)
 
@@ -355,7 +424,7 @@ async def draft_player(league_id: str, team_id: str, player: PlayerDraft):
     
     try:
         async with await db.client.start_session() as session:
-            async with session.start_transaction():
+            async with ownership_transaction(session):
                 # Fetch team details
                 team = await db.teams.find_one({"_id": object_team_id}, session=session)
                 if not team:
@@ -369,16 +438,15 @@ async def draft_player(league_id: str, team_id: str, player: PlayerDraft):
                 player_position = player_doc["position"]
                 
                 # Check roster constraints
-                roster = team.get("roster", [None] * 17)
+                roster = team.get("roster") or empty_roster()
                 
-                handle_roster = roster.copy()
-                # Fetch all player details for the roster
-                for i in range(len(handle_roster)):
-                    player_return = await db.nflplayers.find_one({"_id": handle_roster[i]}, session=session)
-                    if player_return != None:
-                        handle_roster[i] = player_return
-                    else:
-                        handle_roster[i] = None
+                # Check which slots hold real players with one $in query; empty slots are None
+                rostered_ids = [player_id for player_id in roster if player_id is not None]
+                rostered = set()
+                if rostered_ids:
+                    cursor = db.nflplayers.find({"_id": {"$in": rostered_ids}}, {"_id": 1}, session=session)
+                    rostered = {rostered_player["_id"] async for rostered_player in cursor}
+                handle_roster = [player_id if player_id in rostered else None for player_id in roster]
                 
                 # Find available slot for the player
                 slot_index = None
@@ -407,6 +475,9 @@ async def draft_player(league_id: str, team_id: str, player: PlayerDraft):
                 if slot_index is None:
                     raise HTTPException(status_code=400, detail="Team roster is full")
                 
+                # Claim the player first; the unique ownership index rejects double-rostering
+                await claim_player(league_id, object_player_id, object_team_id, session=session)
+
                 # Update the roster
                 roster[slot_index] = object_player_id
 
@@ -420,7 +491,8 @@ async def draft_player(league_id: str, team_id: str, player: PlayerDraft):
                 if result.modified_count == 0:
                     raise HTTPException(status_code=500, detail="Failed to update team roster")
 
-                return {"message": f"Player successfully drafted to position {slot_index}"}
+        await invalidate_tags(f"team:{team_id}", f"league:{league_id}")
+        return {"message": f"Player successfully drafted to position {slot_index}"}
     except PyMongoError as e:
         raise HTTPException(status_code=500, detail=f"Database error occurred: {str(e)}")
 
@@ -437,12 +509,7 @@ async def check_player_availability(league_id: str, player_id: str):
     if not league:
         raise HTTPException(status_code=404, detail="League not found")
     
-    teams_with_player = await db.teams.count_documents({
-        "league": league_object_id,
-        "roster": {"$in": [player_object_id]}
-    })
-    
-    if teams_with_player > 0:
+    if await is_player_owned(league_object_id, player_object_id):
         raise HTTPException(status_code=400, detail="Player already drafted or picked up in this league")
     
 @router.get("/leagues/{league_id}/players/{player_id}/available")
@@ -459,15 +526,27 @@ async def is_player_available(league_id: str, player_id: str):
     if not league:
         raise HTTPException(status_code=404, detail="League not found")
     
-    teams_with_player = await db.teams.count_documents({
-        "league": league_object_id,
-        "roster": {"$in": [player_object_id]}
-    })
-    
-    if teams_with_player > 0:
-        return False
-    
-    return True
+    return not await is_player_owned(league_object_id, player_object_id)
+
+
+async def teardown_league(league: dict, session: ClientSession = None):
+    """Delete everything hanging off a league in a fixed number of bulk writes"""
+    db = get_database()
+    league_id = league["_id"]
+    team_ids = [PyObjectId(team_id) for team_id in league.get("teams", [])]
+
+    await db.users.update_many(
+        {"leagues": league_id},
+        {"$pull": {"leagues": league_id, "teams": {"$in": team_ids}}},
+        session=session
+    )
+    await db.matchups.delete_many({"league": league_id}, session=session)
+    await db.teams.delete_many({"league": league_id}, session=session)
+    if league.get("draft"):
+        await db.drafts.delete_one({"_id": league["draft"]}, session=session)
+    await release_league(league_id, session=session)
+    await invalidate_standings(league_id, session=session)
+    await db.leagues.delete_one({"_id": league_id}, session=session)
 
 
 @router.post("/leagues/{league_id}/teams/{team_id}/remove")
@@ -483,71 +562,35 @@ async def leave_league(league_id: str, team_id: str):
     # remove the league from user's list, remove the team from league's list, clear schedule, delete team
     try:
         async with await db.client.start_session() as session:
-            async with session.start_transaction():
-                team = await db.teams.find_one({"_id" : object_team_id}, session=session) 
-                user_id = team["owner"]
-
-                # remove team from league
-                league = await db.leagues.find_one({"_id": object_league_id}, session=session)
-                teams = league["teams"].copy()
-                matchups = league["schedule"].copy()
-                index = None
-
-                for week in matchups:
-                    for matchup_id in week:
-                        try:
-                            await db.matchups.delete_one({"_id": PyObjectId(matchup_id)}, session=session)
-                        except InvalidId:
-                            print(f"Invalid matchup ID: {matchup_id}")
-                        except PyMongoError as e:
-                            print(f"Error deleting matchup {matchup_id}: {str(e)}")
-
-                for i in range(len(teams)):
-                    if teams[i] == object_team_id:
-                        teams.pop(i)
-                        index = i
-                        break
-                if index is None:
+            async with ownership_transaction(session):
+                team = await db.teams.find_one({"_id": object_team_id}, {"owner": 1}, session=session)
+                if not team:
                     raise HTTPException(status_code=404, detail="team not found")
-                
-                new_league = await db.leagues.update_one(
-                    {"_id": object_league_id},
-                    {"$set": {"teams": teams,
-                              "schedule": []}}, 
+
+                # remove team from league; the schedule is rebuilt once the league fills again
+                league_result = await db.leagues.update_one(
+                    {"_id": object_league_id, "teams": object_team_id},
+                    {"$pull": {"teams": object_team_id},
+                     "$set": {"schedule": []}},
                     session=session
                 )
-                # remove team from user
-                user = await db.users.find_one({"_id": user_id}, session=session)
-                user_teams = user["teams"].copy()
-                index = None
-
-                for i in range(len(user_teams)):
-                    if user_teams[i] == object_team_id:
-                        user_teams.pop(i)
-                        index = i
-                        break
-                if index is None:
+                if league_result.matched_count == 0:
                     raise HTTPException(status_code=404, detail="team not found")
-                
-                user_leagues = user["leagues"].copy()
-                index = None
-
-                for i in range(len(user_leagues)):
-                    if user_leagues[i] == object_league_id:
-                        user_leagues.pop(i)
-                        index = i
-                        break
-                if index is None:
-                    raise HTTPException(status_code=404, detail="league not found")
-                
-                new_user = await db.users.update_one(
-                    {"_id": user_id},
-                    {"$set": {"teams": user_teams,
-                              "leagues": user_leagues}},
+                await db.matchups.delete_many({"league": object_league_id}, session=session)
+
+                # remove team and league from user
+                await db.users.update_one(
+                    {"_id": team["owner"]},
+                    {"$pull": {"teams": object_team_id,
+                               "leagues": object_league_id}},
                     session=session
                 )
 
-                remove_team = await db.teams.delete_one({"_id" : object_team_id}, session=session)
+                await db.teams.delete_one({"_id": object_team_id}, session=session)
+                await release_team(object_team_id, session=session)
+                await invalidate_standings(object_league_id, session=session)
+
+        await invalidate_tags(f"league:{league_id}", f"team:{team_id}")
     except PyMongoError as e:
         raise HTTPException(status_code=500, detail=f"Database error occurred: {str(e)}")
 
@@ -560,54 +603,23 @@ async def remove_league(league_id: str):
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid ID format")
     
-    # remove the league from user's list, remove the team from league's list, clear schedule, delete team
+    # remove the league and its teams from users, delete matchups, teams, draft and league
     try:
         async with await db.client.start_session() as session:
-            async with session.start_transaction():
-                league = await db.leagues.find_one({"_id": object_league_id}, session=session)
-                teams = league["teams"].copy()
-                matchups = league["schedule"].copy()
-
-                # remove league from users, remove team from users
-                for team_id in teams:
-                    team = await db.teams.find_one({"_id": PyObjectId(team_id)}, session=session)
-                    user = await db.users.find_one({"_id": PyObjectId(team["owner"])}, session=session)
-                    user_teams = user["teams"]
-                    user_leagues = user["leagues"]
-                    user_teams.remove(PyObjectId(team_id))
-                    user_leagues.remove(PyObjectId(league_id))
-
-                    new_user = await db.users.update_one(
-                    {"_id": PyObjectId(team["owner"])},
-                    {"$set": {"teams": user_teams,
-                              "leagues": user_leagues}},
+            async with ownership_transaction(session):
+                league = await db.leagues.find_one(
+                    {"_id": object_league_id},
+                    {"teams": 1, "draft": 1},
                     session=session
                 )
+                if not league:
+                    raise HTTPException(status_code=404, detail="League not found")
 
-                # delete matchups
-                for week in matchups:
-                    for matchup_id in week:
-                        try:
-                            await db.matchups.delete_one({"_id": PyObjectId(matchup_id)}, session=session)
-                        except InvalidId:
-                            print(f"Invalid matchup ID: {matchup_id}")
-                        except PyMongoError as e:
-                            print(f"Error deleting matchup {matchup_id}: {str(e)}")
-                
-                # delete teams
-                for team_id in teams:
-                    try:
-                        await db.teams.delete_one({"_id": PyObjectId(team_id)}, session=session)
-                    except InvalidId:
-                        print(f"Invalid team ID: {team_id}")
-                    except PyMongoError as e:
-                        print(f"Error deleting team {team_id}: {str(e)}")
-
-                # delete draft
-                await db.drafts.delete_one({"_id": league["draft"]}, session=session)
-
-                # delete league
-                await db.leagues.delete_one({"_id": object_league_id}, session=session)
+                await teardown_league(league, session=session)
 
+        tags = [f"league:{league_id}"] + [f"team:{team}" for team in league.get("teams", [])]
+        if league.get("draft"):
+            tags.append(f"draft:{league['draft']}")
+        await invalidate_tags(*tags)
     except PyMongoError as e:
-        raise HTTPException(status_code=500, detail=f"Database error occurred: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Database error occurred: {str(e)}")
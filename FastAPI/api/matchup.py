@@ -1,16 +1,35 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, Depends
+from bson import ObjectId
 from models.matchup import Matchup
 from utils.db import get_database
 from pydantic import BaseModel
-from models import PyObjectId
+from models import PyObjectId, PlayerView, shape_player
+from typing import Dict, List
+from services.live_scoring import LiveScoringService
+from services.player_cache import load_players
+from utils.serialization import trusted
+from utils.batch import batch_ids
 
 router = APIRouter()
+live_scoring = LiveScoringService()
 
 class MatchupCreate(BaseModel):
     league_id: PyObjectId
     team1_id: PyObjectId
     team2_id: PyObjectId
 
+@router.websocket("/ws/matchups/{league_id}")
+async def matchup_websocket_endpoint(websocket: WebSocket, league_id: str):
+    await live_scoring.connect_client(websocket, league_id)
+    try:
+        while True:
+            await websocket.receive_text()
+            live_scoring.touch_client(websocket)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await live_scoring.disconnect_client(websocket, league_id)
+
 @router.post("/matchups/", response_model=Matchup)
 async def create_matchups(matchup: MatchupCreate):
     db = get_database()
@@ -28,6 +47,13 @@ async def create_matchups(matchup: MatchupCreate):
         raise HTTPException(status_code=500, detail="Failed to create Matchup")
     return Matchup(**created_matchup)
 
+@router.get("/matchups:batch", response_model=Dict[str, Matchup])
+async def get_matchups_batch(object_ids: List[ObjectId] = Depends(batch_ids("matchup"))):
+    """Matchups keyed by id from one $in query; unknown ids are left out"""
+    db = get_database()
+    matchups = {matchup["_id"]: matchup async for matchup in db.matchups.find({"_id": {"$in": object_ids}})}
+    return {str(matchup_id): matchups[matchup_id] for matchup_id in object_ids if matchup_id in matchups}
+
 @router.get("/matchup/{matchup_id}", response_model=Matchup)
 async def get_matchup(matchup_id: str):
     db = get_database()
@@ -43,7 +69,7 @@ async def get_matchup(matchup_id: str):
     raise HTTPException(status_code=404, detail="matchup not found")
 
 @router.get("/matchups/rosters/{matchup_id}")
-async def get_matchup_rosters(matchup_id: str):
+async def get_matchup_rosters(matchup_id: str, view: PlayerView = "full"):
     db = get_database()
     
     try:
@@ -84,14 +110,11 @@ async def get_matchup_rosters(matchup_id: str):
     # Fetch all valid players in a single query
     players = {}
     if valid_ids:
-        cursor = db.nflplayers.find({"_id": {"$in": valid_ids}})
-        player_list = await cursor.to_list(length=None)
+        player_list = await load_players(valid_ids, view)
         
-        # Convert player documents to dictionaries and handle ObjectId serialization
+        # Trim to the view and handle ObjectId serialization
         for player in player_list:
-            player_dict = dict(player)
-            player_dict["_id"] = str(player_dict["_id"])  # Convert ObjectId to string
-            players[str(player["_id"])] = player_dict
+            players[str(player["_id"])] = shape_player(player, view)
     
     # Construct final rosters maintaining original positions
     team_a_roster = [None] * len(matchup["team_a_roster"])
@@ -104,7 +127,7 @@ async def get_matchup_rosters(matchup_id: str):
         if player_id in players:
             team_b_roster[position] = players[player_id]
     
-    return {
+    return trusted({
         "team_a_roster": team_a_roster,
         "team_b_roster": team_b_roster
-    }
+    })
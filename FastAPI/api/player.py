@@ -1,40 +1,98 @@
 from fastapi import APIRouter, HTTPException, Query
-from models.player import NFLPlayer
+from utils.serialization import trusted
+from models.player import NFLPlayer, NFLPlayerSummary, NFLPlayerRoster
 from utils.db import get_database
 from pydantic import BaseModel
-from models import PyObjectId
-from typing import List, Optional, Dict, Any
+from models import PyObjectId, PlayerView, player_projection, shape_player
+from services.roster_ownership import is_player_owned, owned_player_set
+from services.player_search import PlayerSearchIndex
+from services.player_cache import PlayerCache, bump_player_version
+from typing import List, Optional, Dict, Any, Tuple, Union
+from collections import OrderedDict
 from math import ceil
+import base64
+import json
+import time
 
 router = APIRouter()
 
+# Keyset order; matches the (projected_points, _id) index
+PLAYER_PAGE_SORT = [("projected_points", -1), ("_id", 1)]
+TOTAL_CACHE_SECONDS = 30
+TOTAL_CACHE_MAX_ENTRIES = 256
+# filter signature -> (expires at, exact count), least recently used first
+_total_cache: "OrderedDict[str, Tuple[float, int]]" = OrderedDict()
+
+def _encode_cursor(player: dict) -> str:
+    """Opaque continuation token pointing just past a player in keyset order"""
+    position = json.dumps({"p": player.get("projected_points"), "i": str(player["_id"])})
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+def _decode_cursor(cursor: str) -> dict:
+    """Filter selecting the players after a cursor in keyset order"""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        points, player_id = position["p"], PyObjectId(position["i"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    after_id = {"projected_points": points, "_id": {"$gt": player_id}}
+    if points is None:
+        return after_id  # nulls sort last, only ties remain
+    return {"$or": [{"projected_points": {"$lt": points}}, {"projected_points": None}, after_id]}
+
+async def _count_players(signature: str, query: dict) -> int:
+    """Exact count for a filter, cached briefly per filter signature"""
+    now = time.monotonic()
+    cached = _total_cache.get(signature)
+    if cached and cached[0] > now:
+        _total_cache.move_to_end(signature)
+        return cached[1]
+
+    total = await get_database().nflplayers.count_documents(query)
+    _total_cache[signature] = (now + TOTAL_CACHE_SECONDS, total)
+    _total_cache.move_to_end(signature)
+    # Names are free text, so signatures are unbounded; evict the least recently used
+    while len(_total_cache) > TOTAL_CACHE_MAX_ENTRIES:
+        _total_cache.popitem(last=False)
+    return total
+
 class PaginatedPlayersResponse(BaseModel):
     players: List[NFLPlayer]
     total: int
     total_pages: int
 
-@router.get("/nfl-players/", response_model=List[NFLPlayer])
-async def get_nfl_players(skip: int = 0, limit: int = 100, position: Optional[str] = None, team: Optional[str] = None):
-    db = get_database()
-    query = {}
-    if position:
-        query["position"] = position
-    if team:
-        query["team"] = team
-    players = await db.nflplayers.find(query).skip(skip).limit(limit).to_list(limit)
-    return players
+@router.get("/nfl-players/", response_model=Union[List[NFLPlayerSummary], List[NFLPlayerRoster], List[NFLPlayer]])
+async def get_nfl_players(skip: int = 0, limit: int = 100, position: Optional[str] = None, team: Optional[str] = None, view: PlayerView = "full"):
+    cache = PlayerCache()
+    if cache.loaded:
+        players = cache.find(position, team)[skip:skip + limit]
+    else:
+        db = get_database()
+        query = {}
+        if position:
+            query["position"] = position
+        if team:
+            query["team"] = team
+        players = await db.nflplayers.find(query, player_projection(view)).skip(skip).limit(limit).to_list(limit)
+    # Shaped to the view from our own documents, so skip response model validation
+    return trusted([shape_player(player, view) for player in players])
 
-@router.get("/nfl-players/{player_id}", response_model=NFLPlayer)
-async def get_nfl_player(player_id: str):
-    db = get_database()
-    player = await db.nflplayers.find_one({"_id": PyObjectId(player_id)})
+@router.get("/nfl-players/{player_id}", response_model=Union[NFLPlayerSummary, NFLPlayerRoster, NFLPlayer])
+async def get_nfl_player(player_id: str, view: PlayerView = "full"):
+    cache = PlayerCache()
+    if cache.loaded:
+        player = cache.get(PyObjectId(player_id))
+    else:
+        db = get_database()
+        player = await db.nflplayers.find_one({"_id": PyObjectId(player_id)}, player_projection(view))
     if player is None:
-        return NFLPlayer(
+        player = NFLPlayer(
             name="None",
             position="",
             team=""
-        )
-    return player
+        ).dict(by_alias=True)
+    return trusted(shape_player(player, view))
 
 @router.put("/nfl-players/{player_id}", response_model=NFLPlayer)
 async def update_nfl_player(player_id: str, player: NFLPlayer):
@@ -46,6 +104,9 @@ async def update_nfl_player(player_id: str, player: NFLPlayer):
     )
     if updated_player is None:
         raise HTTPException(status_code=404, detail="Player not found")
+    # Other processes pick the change up from the version bump
+    await bump_player_version()
+    PlayerCache().put(updated_player)
     return updated_player
 
 
@@ -57,77 +118,83 @@ async def get_nfl_players_paginated(
     position: Optional[str] = None,
     team: Optional[str] = None,
     name: Optional[str] = None,
-    available_in_league: Optional[str] = None
+    available_in_league: Optional[str] = None,
+    cursor: Optional[str] = None,
+    keyset: bool = False,
+    include_total: Optional[bool] = None,
+    view: PlayerView = "full"
 ):
+    """Page through players by page number, or by continuation cursor when keyset/cursor is given"""
     db = get_database()
     query = {}
+    keyset = keyset or cursor is not None
+    if include_total is None:
+        include_total = not keyset
 
     if position:
         query["position"] = position
     if team:
         query["team"] = team
-    if name:
+    name_matches = PlayerSearchIndex().match(name) if name else None
+    if name and name_matches is None:
+        # Search index not built yet
         query["name"] = {"$regex": name, "$options": "i"}
     
     skip = (page - 1) * limit
 
-    sort_dict = [("projected_points", -1)]
-
     try:
         object_league_id = PyObjectId(league_id)
     except Exception:
             raise HTTPException(status_code=400, detail="Invalid ID format")
     
-    players_in_league_rosters = []
     if available_in_league:
         try:
             object_league_id = PyObjectId(available_in_league)
-            players_in_league_rosters = await db.teams.distinct(
-                "roster", 
-                {"league": object_league_id}
-            )
-            query["_id"] = {"$nin": players_in_league_rosters}
         except Exception:
             raise HTTPException(status_code=400, detail="Invalid league ID")
+
+    # One ownership read serves both the availability filter and the taken flags
+    owned = await owned_player_set(object_league_id)
+    if available_in_league:
+        if name_matches is not None:
+            name_matches = name_matches.difference(owned)
+        else:
+            query["_id"] = {"$nin": list(owned)}
+
+    if name_matches is not None:
+        query["_id"] = {"$in": list(name_matches)}
     
-    players = await db.nflplayers.find(query).sort(sort_dict).skip(skip).limit(limit).to_list(limit)
+    next_cursor = None
+    if keyset:
+        # Seek past the cursor instead of skipping, so deep pages cost the same as the first
+        # $and keeps the cursor's _id bound from replacing the filter's _id $in/$nin
+        page_query = {"$and": [query, _decode_cursor(cursor)]} if cursor else query
+        players = await db.nflplayers.find(page_query, player_projection(view)).sort(PLAYER_PAGE_SORT).limit(limit + 1).to_list(limit + 1)
+        if len(players) > limit:
+            players = players[:limit]
+            next_cursor = _encode_cursor(players[-1])
+    else:
+        players = await db.nflplayers.find(query, player_projection(view)).sort(PLAYER_PAGE_SORT).skip(skip).limit(limit).to_list(limit)
     
-    if not available_in_league:
-        all_players_in_rosters = await db.teams.distinct(
-            "roster",
-            {"league": object_league_id}
-        )
-        
-        enriched_players = []
-        for player in players:
-            player_dict = {**player, '_id': str(player['_id'])}
-            player_dict['taken'] = player['_id'] in all_players_in_rosters
-            enriched_players.append(player_dict)
-        players = enriched_players
+    players = [{**shape_player(player, view), 'taken': player['_id'] in owned} for player in players]
+
+    response = {"players": players}
+    if keyset:
+        response["next_cursor"] = next_cursor
+        response["limit"] = limit
     else:
-        players_taken_in_league = set(await db.teams.distinct(
-            "roster", 
-            {"league": object_league_id}
-        ))
-        enriched_players = []
-        for player in players:
-            player_dict = {**player, '_id': str(player['_id'])}
-            
-            is_taken = player['_id'] in players_taken_in_league
-            
-            player_dict['taken'] = is_taken
-            enriched_players.append(player_dict)
-        players = enriched_players
-
-    total_players = await db.nflplayers.count_documents(query)
-    total_pages = ceil(total_players / limit)
-
-    return {
-        "players": players,
-        "page": page,
-        "total_pages": total_pages,
-        "total_players": total_players
-    }
+        response["page"] = page
+
+    if include_total:
+        if available_in_league:
+            # Ownership moves with every pick and trade, so availability totals are never cached
+            total_players = await db.nflplayers.count_documents(query)
+        else:
+            total_players = await _count_players(json.dumps([position, team, name]), query)
+        response["total_pages"] = ceil(total_players / limit)
+        response["total_players"] = total_players
+
+    return trusted(response)
 
 class PlayerAvailabilityService:
     @staticmethod
@@ -147,19 +214,15 @@ class PlayerAvailabilityService:
         if not league:
             raise HTTPException(status_code=404, detail="League not found")
         
-        teams_with_player = await db.teams.count_documents({
-            "league": league_object_id,
-            "roster": player_object_id
-        })
-        
-        return teams_with_player == 0
+        return not await is_player_owned(league_object_id, player_object_id)
 
     @staticmethod
     async def get_available_players(
         league_id: str, 
         position: Optional[str] = None,
         limit: int = 20,
-        page: int = 1
+        page: int = 1,
+        view: str = "full"
     ) -> List[Dict]:
         """
         Get available players in a specific league
@@ -172,10 +235,7 @@ class PlayerAvailabilityService:
             raise HTTPException(status_code=400, detail="Invalid league ID")
 
         # Find players already in league rosters
-        players_in_league_rosters = await db.teams.distinct(
-            "roster", 
-            {"league": league_object_id}
-        )
+        players_in_league_rosters = list(await owned_player_set(league_object_id))
         
         # Build query for available players
         query = {
@@ -190,21 +250,22 @@ class PlayerAvailabilityService:
         skip = (page - 1) * limit
         
         # Fetch available players
-        available_players = await db.nflplayers.find(query).skip(skip).limit(limit).to_list(limit)
+        available_players = await db.nflplayers.find(query, player_projection(view)).skip(skip).limit(limit).to_list(limit)
         
-        return available_players
+        return [shape_player(player, view) for player in available_players]
 
 # Endpoint using the service
-@router.get("/leagues/{league_id}/players/available")
+@router.get("/leagues/{league_id}/players/available", response_model=Union[List[NFLPlayerSummary], List[NFLPlayerRoster], List[NFLPlayer]])
 async def get_available_league_players(
     league_id: str, 
     position: Optional[str] = None,
     limit: int = 20,
-    page: int = 1
+    page: int = 1,
+    view: PlayerView = "full"
 ):
-    return await PlayerAvailabilityService.get_available_players(
-        league_id, position, limit, page
-    )
+    return trusted(await PlayerAvailabilityService.get_available_players(
+        league_id, position, limit, page, view
+    ))
 
 # Individual player availability endpoint
 @router.get("/leagues/{league_id}/players/{player_id}/available")
@@ -1,9 +1,17 @@
-from typing import List, Optional
-from fastapi import APIRouter, HTTPException
+from typing import Dict, List, Optional, Union
+from fastapi import APIRouter, HTTPException, Depends
+from bson import ObjectId
+from utils.serialization import trusted
 from models.team import Team
 from utils.db import get_database
 from pydantic import BaseModel
-from models import PyObjectId, NFLPlayer
+from pymongo.errors import PyMongoError
+from models import PyObjectId, NFLPlayer, NFLPlayerSummary, NFLPlayerRoster, PlayerView, empty_roster, shape_player
+from services.roster_ownership import claim_player, release_player, release_team, ownership_transaction
+from services.standings import rename_team_standing
+from services.player_cache import load_players
+from utils.response_cache import invalidate_tags
+from utils.batch import batch_ids
 
 router = APIRouter()
 
@@ -45,6 +53,9 @@ async def change_team_name(team_id: str, new_name: str):
     result = await db.teams.update_one( {"_id": object_id}, {"$set": {"name": new_name}})
 
     updated_team = await db.teams.find_one({"_id": object_id})
+    if updated_team:
+        await rename_team_standing(updated_team["league"], object_id, new_name)
+        await invalidate_tags(f"team:{team_id}", f"league:{updated_team['league']}")
     return Team(**updated_team)
 
 # curl -X POST "http://localhost:8000/teams/"      -H "Content-Type: application/json"      -d '{ "name": "Touchdown Titans", "owner": "66d68d8501059434755b066b", "league": "66d7ce08e970f0b1a331d4d1" }'
@@ -65,6 +76,27 @@ async def create_team(team: TeamCreate):
         raise HTTPException(status_code=500, detail="Failed to create Team")
     return Team(**created_team)
 
+def bye_team() -> Team:
+    """Placeholder served for ids with no team, such as the bye side of a matchup"""
+    return Team(
+        id=PyObjectId(),
+        name="BYE",
+        owner=PyObjectId(),
+        league=PyObjectId(),
+        roster=empty_roster(),
+        total_points=0.0,
+        wins=0,
+        losses=0
+    )
+
+# curl "http://localhost:8000/teams:batch?ids=66d7dda054dc5c8694c3c66d,66d7dda054dc5c8694c3c66e"
+@router.get("/teams:batch", response_model=Dict[str, Team])
+async def get_teams_batch(object_ids: List[ObjectId] = Depends(batch_ids("team"))):
+    """Teams keyed by id from one $in query; unknown ids get the BYE team like get_team"""
+    db = get_database()
+    teams = {team["_id"]: team async for team in db.teams.find({"_id": {"$in": object_ids}})}
+    return {str(team_id): teams.get(team_id) or bye_team() for team_id in object_ids}
+
 @router.get("/teams/{team_id}", response_model=Team)
 async def get_team(team_id: str):
     db = get_database()
@@ -79,19 +111,10 @@ async def get_team(team_id: str):
     if team:
         return team
     else:
-        return Team(
-            id=PyObjectId(),
-            name="BYE",
-            owner=PyObjectId(),
-            league=PyObjectId(),
-            roster=[PyObjectId() for _ in range(17)],
-            total_points=0.0,
-            wins=0,
-            losses=0
-        )
+        return bye_team()
     
-@router.get("/teams/roster/{team_id}", response_model=List[Optional[NFLPlayer]])
-async def get_team_roster(team_id: str):
+@router.get("/teams/roster/{team_id}", response_model=Union[List[Optional[NFLPlayerSummary]], List[Optional[NFLPlayerRoster]], List[Optional[NFLPlayer]]])
+async def get_team_roster(team_id: str, view: PlayerView = "full"):
     db = get_database()
     
     try:
@@ -117,20 +140,20 @@ async def get_team_roster(team_id: str):
             except Exception:
                 pass
     
-    # Fetch all valid players in a single query
+    # Fetch all valid players from the player cache, or in a single query
     players = {}
     if valid_ids:
-        cursor = db.nflplayers.find({"_id": {"$in": valid_ids}})
-        player_list = await cursor.to_list(length=None)
+        player_list = await load_players(valid_ids, view)
         players = {str(player["_id"]): player for player in player_list}
     
     # Construct final roster maintaining original positions
     roster = [None] * len(team["roster"])
     for player_id, position in id_positions.items():
         if player_id in players:
-            roster[position] = players[player_id]
+            roster[position] = shape_player(players[player_id], view)
     
-    return roster
+    # Shaped to the view from our own documents, so skip response model validation
+    return trusted(roster)
 
 @router.delete("/teams/{team_id}", response_model=dict)
 async def delete_team(team_id: str):
@@ -141,11 +164,19 @@ async def delete_team(team_id: str):
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid team ID format")
         
-    result = await db.teams.delete_one({"_id": team_id})
-
-    if result.deleted_count:
-        return {"message": "Team deleted successfully"}
-    raise HTTPException(status_code=404, detail="Team not found")
+    # Delete the team and release its players together
+    try:
+        async with await db.client.start_session() as session:
+            async with ownership_transaction(session):
+                result = await db.teams.delete_one({"_id": object_id}, session=session)
+                if not result.deleted_count:
+                    raise HTTPException(status_code=404, detail="Team not found")
+                await release_team(object_id, session=session)
+    except PyMongoError as e:
+        raise HTTPException(status_code=500, detail=f"Database error occurred: {str(e)}")
+
+    await invalidate_tags(f"team:{team_id}")
+    return {"message": "Team deleted successfully"}
 
 # curl -X POST "http://localhost:8000/teams/66d7dda054dc5c8694c3c66d/add_player"      -H "Content-Type: application/json"      -d '{"player_id": "66d7e3c75abe89749d086c3c"}'
 @router.post("/teams/{team_id}/add_player")
@@ -157,18 +188,28 @@ async def add_player(team_id: str, player: PlayerAdd):
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid team ID format")
 
-    team = await db.teams.find_one({"_id": object_id})
-    if not team:
-        raise HTTPException(status_code=404, detail="team not found")
-
-    result = await db.teams.update_one(
-        {"_id": object_id},
-        {"$addToSet": {"roster": player.player_id}}
-    )
-
-    if result.modified_count == 0:
-        raise HTTPException(status_code=500, detail="Failed to add player to team.")
-
+    # Claim the player and add it to the roster together, so a failed add leaves no claim behind
+    try:
+        async with await db.client.start_session() as session:
+            async with ownership_transaction(session):
+                team = await db.teams.find_one({"_id": object_id}, session=session)
+                if not team:
+                    raise HTTPException(status_code=404, detail="team not found")
+
+                await claim_player(team["league"], player.player_id, object_id, session=session)
+
+                result = await db.teams.update_one(
+                    {"_id": object_id},
+                    {"$addToSet": {"roster": player.player_id}},
+                    session=session
+                )
+
+                if result.modified_count == 0:
+                    raise HTTPException(status_code=500, detail="Failed to add player to team.")
+    except PyMongoError as e:
+        raise HTTPException(status_code=500, detail=f"Database error occurred: {str(e)}")
+
+    await invalidate_tags(f"team:{team_id}", f"league:{team['league']}")
     updated_team = await db.teams.find_one({"_id": object_id})
     return Team(**updated_team)
 
@@ -182,25 +223,35 @@ async def remove_player(team_id: str, player_id: str):
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid team ID format")
 
-    team = await db.teams.find_one({"_id": object_team_id})
-    if not team:
-        raise HTTPException(status_code=404, detail="team not found")
-
-    new_roster = team["roster"].copy()
-    index = None
-    for i in range(len(new_roster)):
-        if new_roster[i] == object_player_id:
-            new_roster[i] = PyObjectId()
-            index = i
-            break
-
-    if index is None:
-        raise HTTPException(status_code=404, detail="player not found")
-
-    result = await db.teams.update_one(
-        {"_id": object_team_id},
-        {"$set": {"roster": new_roster}}
-    )
+    # Clear the slot and release the player together
+    try:
+        async with await db.client.start_session() as session:
+            async with ownership_transaction(session):
+                team = await db.teams.find_one({"_id": object_team_id}, session=session)
+                if not team:
+                    raise HTTPException(status_code=404, detail="team not found")
+
+                new_roster = team["roster"].copy()
+                index = None
+                for i in range(len(new_roster)):
+                    if new_roster[i] == object_player_id:
+                        new_roster[i] = None
+                        index = i
+                        break
+
+                if index is None:
+                    raise HTTPException(status_code=404, detail="player not found")
+
+                await db.teams.update_one(
+                    {"_id": object_team_id},
+                    {"$set": {"roster": new_roster}},
+                    session=session
+                )
+                await release_player(team["league"], object_player_id, session=session)
+    except PyMongoError as e:
+        raise HTTPException(status_code=500, detail=f"Database error occurred: {str(e)}")
+
+    await invalidate_tags(f"team:{team_id}", f"league:{team['league']}")
 
     updated_team = await db.teams.find_one({"_id": object_team_id})
     return Team(**updated_team)
@@ -231,13 +282,19 @@ async def move_players(team_id: str, player_move: PlayerMove):
     spot2 = player_move.uid2
 
     try:
-        player1_id = PyObjectId(access_roster[player_move.uid1])  # Using PyObjectId for validation
-        player2_id = PyObjectId(access_roster[player_move.uid2])
+        # Open slots are None
+        player1_id = PyObjectId(access_roster[spot1]) if access_roster[spot1] is not None else None  # Using PyObjectId for validation
+        player2_id = PyObjectId(access_roster[spot2]) if access_roster[spot2] is not None else None
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid team ID format")
 
-    player1 = await db.nflplayers.find_one({"_id": player1_id})
-    player2 = await db.nflplayers.find_one({"_id": player2_id})
+    player_ids = [player_id for player_id in (player1_id, player2_id) if player_id is not None]
+    players = {}
+    if player_ids:
+        cursor = db.nflplayers.find({"_id": {"$in": player_ids}}, {"position": 1})
+        players = {player["_id"]: player async for player in cursor}
+    player1 = players.get(player1_id)
+    player2 = players.get(player2_id)
 
     if player1 is None:
         spots1 = []
@@ -252,7 +309,7 @@ async def move_players(team_id: str, player_move: PlayerMove):
     if spots1 != []:
         if spot2 in spots1:
             if spots2 == []:
-                roster[spot1] = PyObjectId()
+                roster[spot1] = None
             roster[spot2] = access_roster[spot1]
         else:
             raise HTTPException(status_code=400, detail="Can't move here") 
@@ -260,7 +317,7 @@ async def move_players(team_id: str, player_move: PlayerMove):
     if spots2 != []:
         if spot1 in spots2:
             if spots1 == []:
-                roster[spot2] = PyObjectId()
+                roster[spot2] = None
             roster[spot1] = access_roster[spot2]
         else:
             raise HTTPException(status_code=400, detail="Can't move here")
@@ -269,6 +326,7 @@ async def move_players(team_id: str, player_move: PlayerMove):
         {"_id": object__id},
         {"$set": {"roster": roster}}
     )
+    await invalidate_tags(f"team:{team_id}", f"league:{team['league']}")
 
     updated_team = await db.teams.find_one({"_id": object__id})
     return Team(**updated_team)
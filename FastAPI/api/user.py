@@ -1,10 +1,13 @@
-from typing import List
+from typing import Dict, List
 from fastapi import APIRouter, HTTPException, Depends, status
 from models.user import User
 from utils.db import get_database
 from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import BaseModel
-from models import PyObjectId
+from models import PyObjectId, UserPublic, USER_PUBLIC_PROJECTION
+from utils.serialization import trusted
+from utils.batch import batch_ids
+from bson import ObjectId
 from pymongo.errors import PyMongoError
 from datetime import timedelta
 from utils.auth import (
@@ -45,6 +48,13 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
 async def read_users_me(current_user: User = Depends(get_current_active_user)):
     return current_user
 
+@router.get("/users:batch", response_model=Dict[str, UserPublic])
+async def get_users_batch(object_ids: List[ObjectId] = Depends(batch_ids("user"))):
+    """Users keyed by id from one $in query; unknown ids are left out"""
+    db = get_database()
+    users = {user["_id"]: user async for user in db.users.find({"_id": {"$in": object_ids}}, USER_PUBLIC_PROJECTION)}
+    return {str(user_id): users[user_id] for user_id in object_ids if user_id in users}
+
 @router.get("/users/{user_id}", response_model=User)
 async def get_user(user_id: str):
     db = get_database()
@@ -60,12 +70,13 @@ async def get_user(user_id: str):
         return user
     raise HTTPException(status_code=404, detail="User not found")
 
-@router.get("/users/", response_model=List[User])
+@router.get("/users/", response_model=List[UserPublic])
 async def get_all_users(current_user: User = Depends(get_current_active_user)):
     try:
         db = get_database()
-        users = await db.users.find().to_list(length=None)
-        return users
+        users = await db.users.find({}, USER_PUBLIC_PROJECTION).to_list(length=None)
+        # Written through the User model and projected to UserPublic's fields
+        return trusted(users)
     except PyMongoError as e:
         raise HTTPException(status_code=500, detail=f"Error fetching users: {str(e)}")
 
@@ -0,0 +1,337 @@
+"""
+Draft night load generator.
+
+Spins up N leagues with a live snake draft each, connects an in-process
+websocket client per team to DraftManager, then drives every pick through
+the real draft_player endpoint or DraftManager._handle_timeout. Reports
+pick-to-broadcast latency, Mongo operations per pick and event-loop lag.
+
+Run from the FastAPI directory:
+
+    pip install -r requirements-dev.txt
+    python -m benchmarks.draft_load --leagues 200 --teams 12
+
+or against a local replica-set mongod (transactions need a replica set):
+
+    python -m benchmarks.draft_load --mongo-url "mongodb://localhost:27017/?replicaSet=rs0" --leagues 1000
+
+Redis is off unless --redis-url is given, so the run never reaches for the
+host in .env; ownership reads then take the database fallback.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from bson import ObjectId
+
+MOCK_URL = "mongomock"
+REDIS_OFF = "off"
+BENCH_DATABASE = "draft_load_bench"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Simulate concurrent draft rooms against one API process")
+    parser.add_argument("--leagues", type=int, default=100, help="number of concurrent drafts")
+    parser.add_argument("--teams", type=int, default=12, help="teams per league")
+    parser.add_argument("--rounds", type=int, default=17, help="draft rounds")
+    parser.add_argument("--clients-per-team", type=int, default=1, help="websocket clients per team")
+    parser.add_argument("--timeout-ratio", type=float, default=0.3, help="share of picks resolved by timeout autopick")
+    parser.add_argument("--pick-delay", type=float, default=0.0, help="seconds a manager thinks before each pick")
+    parser.add_argument("--monitor", action="store_true", help="also run DraftManager's per-draft monitor tasks")
+    parser.add_argument("--mongo-url", default=MOCK_URL, help=f"'{MOCK_URL}' or a mongodb:// URL")
+    parser.add_argument("--redis-url", default=REDIS_OFF, help=f"'{REDIS_OFF}' or a redis:// URL")
+    parser.add_argument("--seed", type=int, default=7)
+    return parser.parse_args()
+
+
+class OperationCounter:
+    """Counts Mongo commands, either from pymongo command monitoring or mongomock calls"""
+
+    def __init__(self):
+        self.count = 0
+
+    # pymongo.monitoring.CommandListener interface
+    def started(self, event):
+        if event.command_name not in ("ping", "hello", "isMaster", "endSessions", "commitTransaction", "abortTransaction"):
+            self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+class _MockSession:
+    """Falsy stand-in for a client session; mongomock rejects any truthy session"""
+
+    def __bool__(self):
+        return False
+
+    def __await__(self):
+        if False:
+            yield
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def start_transaction(self):
+        return self
+
+
+def connect(mongo_url: str, counter: OperationCounter):
+    """Point utils.db at the benchmark database before the app modules use it"""
+    os.environ["MONGODB_URL"] = "mongodb://localhost:27017" if mongo_url == MOCK_URL else mongo_url
+    from utils import db as db_module
+
+    if mongo_url == MOCK_URL:
+        import mongomock
+        from mongomock_motor import AsyncMongoMockClient
+
+        mongomock.MongoClient.start_session = lambda self, *args, **kwargs: _MockSession()
+        for method in ("find", "find_one", "insert_one", "insert_many", "update_one", "update_many",
+                       "delete_one", "delete_many", "count_documents", "distinct", "aggregate",
+                       "bulk_write", "find_one_and_update"):
+            original = getattr(mongomock.collection.Collection, method)
+
+            def counted(self, *args, _original=original, **kwargs):
+                counter.count += 1
+                return _original(self, *args, **kwargs)
+
+            setattr(mongomock.collection.Collection, method, counted)
+
+        client = AsyncMongoMockClient()
+    else:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(mongo_url, event_listeners=[counter])
+
+    db_module.client = client
+    db_module.db = client.get_database(BENCH_DATABASE)
+    return db_module.db
+
+
+class _OfflineRedis:
+    """Client that fails every command at once, like an unreachable Redis without the connect timeout"""
+
+    def __getattr__(self, name):
+        async def unavailable(*args, **kwargs):
+            raise ConnectionError("Redis is disabled for this benchmark")
+        return unavailable
+
+    def pipeline(self, *args, **kwargs):
+        raise ConnectionError("Redis is disabled for this benchmark")
+
+    def pubsub(self):
+        raise ConnectionError("Redis is disabled for this benchmark")
+
+
+def connect_redis(redis_url: str):
+    """Install the shared Redis client before the app modules ask for one"""
+    from utils import redis_client
+
+    if redis_url == REDIS_OFF:
+        redis_client.client = _OfflineRedis()
+    else:
+        import redis.asyncio as aioredis
+        redis_client.client = aioredis.from_url(redis_url)
+
+
+class BenchWebSocket:
+    """In-process websocket client that records when each draft event arrives"""
+
+    def __init__(self):
+        self.received: Dict[int, Tuple[float, dict]] = {}
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, message: dict):
+        if "seq" in message and message.get("type") != "sync":
+            self.received[message["seq"]] = (time.perf_counter(), message)
+
+    async def close(self):
+        pass
+
+
+async def seed(db, args) -> List[dict]:
+    """Insert the player pool and one live draft per league"""
+    with open("proj_players.json") as file:
+        players = json.load(file)
+    for player in players:
+        player["_id"] = ObjectId()
+
+    await db.drop_collection("nflplayers")
+    for name in ("leagues", "teams", "drafts", "users", "matchups", "roster_ownership"):
+        await db.drop_collection(name)
+    await db.nflplayers.insert_many(players)
+
+    leagues = []
+    for _ in range(args.leagues):
+        league_id = ObjectId()
+        draft_id = ObjectId()
+        team_ids = [ObjectId() for _ in range(args.teams)]
+
+        await db.teams.insert_many([
+            {"_id": team_id, "name": f"Team {index}", "owner": ObjectId(), "league": league_id,
+             "roster": [None] * 17, "total_points": 0.0, "wins": 0, "losses": 0}
+            for index, team_id in enumerate(team_ids)
+        ])
+        await db.leagues.insert_one({
+            "_id": league_id, "name": "Bench League", "commissioner": ObjectId(),
+            "number_of_players": args.teams, "teams": team_ids, "schedule": [], "draft": draft_id, "week": 1
+        })
+        await db.drafts.insert_one({
+            "_id": draft_id, "league": league_id, "draft_order": team_ids, "draft_type": "snake",
+            "current_round": 1, "current_pick": 1, "total_rounds": args.rounds, "time_per_pick": 60.0,
+            "status": "started", "pick_list": [],
+            "next_pick_time": _far_future(), "start_time": _far_future()
+        })
+        leagues.append({"league_id": str(league_id), "draft_id": str(draft_id), "teams": [str(t) for t in team_ids]})
+
+    from services.roster_ownership import initialize_roster_ownership
+    await initialize_roster_ownership()
+
+    return leagues
+
+
+def _far_future():
+    return datetime.now() + timedelta(days=1)
+
+
+async def run_league(league: dict, args, rng: random.Random, latencies: List[float], failures: List[str]):
+    from api.draft import draft_manager, draft_player, PlayerDraft
+    from services.draft_board import find_roster_slot
+
+    league_id = league["league_id"]
+    draft_id = league["draft_id"]
+    order = league["teams"]
+
+    sockets = [BenchWebSocket() for _ in range(len(order) * args.clients_per_team)]
+    for websocket in sockets:
+        await draft_manager.connect_client(websocket, league_id)
+
+    if args.monitor:
+        await draft_manager.start_draft_monitoring(draft_id, league_id)
+    board = await draft_manager.get_board(draft_id, league_id)
+    slot_positions = {team_id: [None] * 17 for team_id in order}
+
+    for pick_number in range(args.rounds * len(order)):
+        round_index, pick_index = divmod(pick_number, len(order))
+        team_id = order[pick_index] if round_index % 2 == 0 else order[len(order) - 1 - pick_index]
+
+        if args.pick_delay:
+            await asyncio.sleep(args.pick_delay * rng.random())
+
+        expected_seq = draft_manager.event_seq.get(league_id, 0) + 1
+        started = time.perf_counter()
+        try:
+            if rng.random() < args.timeout_ratio:
+                await draft_manager._handle_timeout(draft_id, league_id)
+            else:
+                choice = board.best_available(_needed_positions(slot_positions[team_id]) or None) or board.best_available()
+                await draft_player(league_id, team_id, PlayerDraft(player_id=choice["_id"]))
+        except Exception as e:
+            failures.append(f"{league_id} pick {pick_number + 1}: {e!r}")
+            break
+
+        arrivals = [websocket.received[expected_seq] for websocket in sockets if expected_seq in websocket.received]
+        if not arrivals:
+            continue
+        latencies.append(max(arrival for arrival, _ in arrivals) - started)
+
+        # Mirror the roster locally from the broadcast so manual picks stay legal
+        position = board.position_of(arrivals[0][1].get("player_id") or None)
+        if position:
+            slot = find_roster_slot(slot_positions[team_id], position)
+            if slot is not None:
+                slot_positions[team_id][slot] = position
+
+    for websocket in sockets:
+        await draft_manager.disconnect_client(websocket, league_id)
+    await draft_manager.stop_draft_monitoring(draft_id, league_id)
+
+
+def _needed_positions(slot_positions: List[Optional[str]]) -> Set[str]:
+    from services.draft_board import STARTER_SLOTS
+    needed = set()
+    for slot, accepted in STARTER_SLOTS:
+        if slot_positions[slot] is None:
+            needed.update(accepted)
+    return needed
+
+
+async def sample_loop_lag(samples: List[float], interval: float = 0.05):
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, time.perf_counter() - started - interval))
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def main(args):
+    counter = OperationCounter()
+    db = connect(args.mongo_url, counter)
+    connect_redis(args.redis_url)
+    rng = random.Random(args.seed)
+
+    print(f"Seeding {args.leagues} leagues x {args.teams} teams...")
+    leagues = await seed(db, args)
+
+    latencies: List[float] = []
+    lag_samples: List[float] = []
+    failures: List[str] = []
+
+    lag_task = asyncio.create_task(sample_loop_lag(lag_samples))
+    counter.count = 0
+    started = time.perf_counter()
+
+    # With Redis off every ownership read logs its fallback; keep that out of the report
+    quiet = contextlib.redirect_stdout(io.StringIO()) if args.redis_url == REDIS_OFF else contextlib.nullcontext()
+    with quiet:
+        await asyncio.gather(*(
+            run_league(league, args, random.Random(rng.random()), latencies, failures) for league in leagues
+        ))
+
+    elapsed = time.perf_counter() - started
+    lag_task.cancel()
+
+    from services.heartbeat import HeartbeatScheduler
+    HeartbeatScheduler().cleanup()
+
+    picks = len(latencies)
+    print()
+    print(f"Drafts:               {args.leagues} ({args.teams} teams, {args.rounds} rounds)")
+    print(f"Picks broadcast:      {picks} in {elapsed:.2f}s ({picks / elapsed if elapsed else 0:.1f} picks/s)")
+    print(f"Pick->broadcast p50:  {percentile(latencies, 50) * 1000:.2f} ms")
+    print(f"Pick->broadcast p99:  {percentile(latencies, 99) * 1000:.2f} ms")
+    print(f"Pick->broadcast max:  {max(latencies, default=0.0) * 1000:.2f} ms")
+    print(f"Mongo ops per pick:   {counter.count / picks if picks else 0:.1f}")
+    print(f"Event-loop lag p50:   {percentile(lag_samples, 50) * 1000:.2f} ms")
+    print(f"Event-loop lag p99:   {percentile(lag_samples, 99) * 1000:.2f} ms")
+    print(f"Event-loop lag mean:  {statistics.mean(lag_samples) * 1000 if lag_samples else 0:.2f} ms")
+    if failures:
+        print(f"Failed drafts:        {len(failures)}")
+        for failure in failures[:5]:
+            print(f"  {failure}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -8,10 +8,24 @@ from utils.config import CELERY_BROKER_URL, CELERY_RESULT_BACKEND
 from services.draft_manager import DraftManager
 from services.week_manager import WeekManager
 from services.matchup_manager import MatchupManager
+from services.heartbeat import HeartbeatScheduler
+from services.live_scoring import LiveScoringService
+from services.player_events import PlayerEventListener
+from services.player_search import PlayerSearchIndex
+from services.player_cache import PlayerCache
+from utils.redis_client import close_redis
+from services.roster_ownership import initialize_roster_ownership
+from utils.migrations import run_migrations, warn_on_collection_scans
+from utils.response_cache import ResponseCacheMiddleware
+from utils.serialization import FastResponse
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await ping_database()
+    await run_migrations()
+    await warn_on_collection_scans()
+    await initialize_roster_ownership()
+    await PlayerCache().initialize()
     
     # Initialize other managers
     draft_manager = DraftManager()
@@ -23,16 +37,22 @@ async def lifespan(app: FastAPI):
     print(f"Restored {restored_drafts} drafts")
     await week_manager.initialize()
     await matchup_manager.initialize() 
+    await PlayerSearchIndex().initialize()
+    await LiveScoringService().initialize()
     
     yield
     
     for task in draft_manager.active_drafts.values():
         task.cancel()
+    HeartbeatScheduler().cleanup()
     week_manager.cleanup()
     matchup_manager.cleanup()
+    PlayerCache().cleanup()
+    PlayerEventListener().cleanup()
+    await close_redis()
     await close_mongo_connection()
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=FastResponse)
 
 # Add Celery monitoring endpoint (optional)
 @app.get("/celery-status")
@@ -56,6 +76,9 @@ origins = [
     "http://localhost:3000"
 ]
 
+# Added before CORS so CORS stays the outermost layer and also wraps cache hits
+app.add_middleware(ResponseCacheMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -1,7 +1,7 @@
-from .user import User
-from .player import NFLPlayer, NFLPlayerStats
-from .team import Team, TeamRoster
-from .league import League, ScoringRules
+from .user import User, UserPublic, USER_PUBLIC_PROJECTION
+from .player import NFLPlayer, NFLPlayerStats, NFLPlayerSummary, NFLPlayerRoster, PlayerView, player_projection, shape_player
+from .team import Team, TeamRoster, empty_roster
+from .league import League, ScoringRules, to_points
 from .matchup import Matchup
 from .draft import Draft
 from .transaction import Transaction, PlayerTransaction
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional
 from datetime import datetime, timedelta
 from bson import ObjectId
 from .base import PyObjectId
@@ -16,7 +16,7 @@ class Draft(BaseModel):
     current_pick: int = 1
     total_rounds: int = 17
     status: str = "scheduled"
-    pick_list: List[PyObjectId] = []
+    pick_list: List[Optional[PyObjectId]] = []
 
     class Config:
         allow_population_by_field_name = True
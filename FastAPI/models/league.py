@@ -27,6 +27,13 @@ def calculate_nfl_weeks() -> Tuple[int, int]:
     
     return current_week
 
+def to_points(value) -> float:
+    """A scraped weekly score as a number; blanks and placeholders count as zero"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
 class ScoringRules(BaseModel):
     passing_yards: float = 0.04  # 1 point per 25 yards
     passing_touchdowns: int = 4
@@ -1,7 +1,8 @@
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel, Field
 from bson import ObjectId
 from .base import PyObjectId
+from .team import empty_roster
 
 class Matchup(BaseModel):
     id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
@@ -9,8 +10,8 @@ class Matchup(BaseModel):
     week: int
     team_a: PyObjectId
     team_b: PyObjectId
-    team_a_roster: List[PyObjectId] = Field(default_factory=lambda: [PyObjectId() for _ in range(17)])
-    team_b_roster: List[PyObjectId] = Field(default_factory=lambda: [PyObjectId() for _ in range(17)])
+    team_a_roster: List[Optional[PyObjectId]] = Field(default_factory=empty_roster)
+    team_b_roster: List[Optional[PyObjectId]] = Field(default_factory=empty_roster)
     team_a_score: float = 0.0
     team_b_score: float = 0.0
     status: str = "scheduled"
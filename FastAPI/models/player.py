@@ -1,7 +1,7 @@
 from bson import ObjectId
 from .base import PyObjectId
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 class NFLPlayerStats(BaseModel):
     passing_yards: int = 0
@@ -28,3 +28,53 @@ class NFLPlayer(BaseModel):
         allow_population_by_field_name = True
         arbitrary_types_allowed = True
         json_encoders = {ObjectId: str}
+
+
+class NFLPlayerSummary(BaseModel):
+    """What every player list shows: who, where and how good"""
+    id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
+    name: str
+    position: str
+    team: str
+    projected_points: float = 0.0
+    injury_status: Optional[str] = None
+
+    class Config:
+        allow_population_by_field_name = True
+        arbitrary_types_allowed = True
+        json_encoders = {ObjectId: str}
+
+class NFLPlayerRoster(NFLPlayerSummary):
+    """Summary plus the points columns of roster and matchup tables"""
+    weeks: List[float] = []
+    total_points: float = 0.0
+    opponent: str = ""
+
+
+# Named field sets; list endpoints take ?view= and fetch only these fields
+PlayerView = Literal["summary", "roster", "full"]
+PLAYER_VIEWS = {"summary": NFLPlayerSummary, "roster": NFLPlayerRoster, "full": NFLPlayer}
+
+def _field_default(field) -> Any:
+    default = field.get_default()
+    return default.dict() if isinstance(default, BaseModel) else default
+
+_VIEW_DEFAULTS = {
+    view: {field.alias: _field_default(field) for field in model.__fields__.values()}
+    for view, model in PLAYER_VIEWS.items()
+}
+
+def player_projection(view: str) -> Optional[Dict[str, int]]:
+    """Mongo projection for a view, or None when every field is needed"""
+    if view == "full":
+        return None
+    return {field: 1 for field in _VIEW_DEFAULTS[view]}
+
+def shape_player(player: dict, view: str = "full") -> dict:
+    """JSON-ready copy of a player document with just the view's fields, defaults filled in
+
+    Equivalent to the view model's .dict(by_alias=True) without per-field validation.
+    """
+    shaped = {field: player.get(field, default) for field, default in _VIEW_DEFAULTS[view].items()}
+    shaped["_id"] = str(player["_id"])
+    return shaped
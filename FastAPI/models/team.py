@@ -3,6 +3,12 @@ from typing import List, Optional
 from bson import ObjectId
 from .base import PyObjectId
 
+ROSTER_SIZE = 17
+
+def empty_roster() -> List[Optional[PyObjectId]]:
+    """A roster with every slot open; empty slots are stored as null"""
+    return [None] * ROSTER_SIZE
+
 class TeamRoster(BaseModel):
     player: PyObjectId
     position: str
@@ -12,7 +18,7 @@ class Team(BaseModel):
     name: str
     owner: PyObjectId
     league: PyObjectId
-    roster: List[PyObjectId] = Field(default_factory=lambda: [PyObjectId() for _ in range(17)])
+    roster: List[Optional[PyObjectId]] = Field(default_factory=empty_roster)
     total_points: float = 0.0
     wins: int = 0
     losses: int = 0
@@ -1,9 +1,25 @@
 from pydantic import BaseModel, Field
 from .base import PyObjectId
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 from bson import ObjectId
 
+# Mongo projection matching UserPublic, so credentials never leave the database
+USER_PUBLIC_PROJECTION = {"username": 1, "name": 1, "join_date": 1, "teams": 1, "leagues": 1}
+
+class UserPublic(BaseModel):
+    """A user as other users see them, without credentials"""
+    id: PyObjectId = Field(alias="_id")
+    username: str
+    name: str
+    join_date: Optional[datetime] = None
+    teams: List[PyObjectId] = []
+    leagues: List[PyObjectId] = []
+
+    class Config:
+        allow_population_by_field_name = True
+        json_encoders = {ObjectId: str}
+
 class User(BaseModel):
     id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
     username: str
@@ -4,6 +4,9 @@ from bs4 import BeautifulSoup
 import json
 from utils.db import get_database
 from services.fake_player import FakeNFLPlayer
+from services.player_events import publish_player_updates
+from services.player_cache import bump_player_version
+from models.league import to_points
 from datetime import datetime, time, timezone
 from typing import Dict, List, Tuple
 
@@ -63,8 +66,15 @@ class DataScrapeManager:
         updated_players.sort(key=lambda x: x['projected_points'], reverse=True)
 
         # Update database and save to file
+        changes = []
         for player in updated_players:
-            await self.write_individual_player(player)
+            change = await self.write_individual_player(player, week)
+            if change:
+                changes.append(change)
+
+        # Let the API processes refresh their player caches and live matchup scores
+        version = await bump_player_version()
+        await publish_player_updates(week, changes, version)
 
         # Save to JSON file
         filename = "proj_players.json"
@@ -313,7 +323,8 @@ class DataScrapeManager:
         
         return current_players
 
-    async def write_individual_player(self, player):
+    async def write_individual_player(self, player, week: int = None):
+        """Upsert a player; returns the player's new weekly points if they changed"""
         db = get_database()
         
         player_object = await db.nflplayers.find_one({"name": player["name"]})
@@ -330,5 +341,18 @@ class DataScrapeManager:
                         "injury_status": player["injury_status"]
                     }
                 })
+            player_id = player_object["_id"]
+            old_weeks = player_object.get("weeks", [])
         else:
-            await db.nflplayers.insert_one(player)
\ No newline at end of file
+            result = await db.nflplayers.insert_one(player)
+            player_id = result.inserted_id
+            old_weeks = []
+
+        if week is None or len(player["weeks"]) < week:
+            return None
+
+        new_points = to_points(player["weeks"][week - 1])
+        old_points = to_points(old_weeks[week - 1]) if len(old_weeks) >= week else 0.0
+        if new_points == old_points:
+            return None
+        return {"_id": str(player_id), "points": new_points}
@@ -0,0 +1,181 @@
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+from models.team import ROSTER_SIZE
+from services.player_search import PlayerSearchIndex
+
+# Positions each roster slot accepts, in the order slots are filled
+STARTER_SLOTS = [
+    (0, ("QB",)),
+    (1, ("RB",)),
+    (2, ("RB",)),
+    (3, ("WR",)),
+    (4, ("WR",)),
+    (5, ("TE",)),
+    (6, ("RB", "WR", "TE")),  # FLEX
+    (7, ("DEF",)),
+    (8, ("K",)),
+]
+BENCH_SLOTS = list(range(9, ROSTER_SIZE))
+
+PLAYER_BOARD_FIELDS = {
+    "_id": 1,
+    "name": 1,
+    "position": 1,
+    "team": 1,
+    "projected_points": 1,
+    "total_points": 1,
+    "weeks": 1,
+    "opponent": 1,
+    "injury_status": 1,
+}
+
+
+def find_roster_slot(slot_positions: Sequence[Optional[str]], position: str) -> Optional[int]:
+    """First open slot for a player of the given position, or None if the roster is full"""
+    for slot, accepted in STARTER_SLOTS:
+        if position in accepted and slot < len(slot_positions) and slot_positions[slot] is None:
+            return slot
+
+    for slot in BENCH_SLOTS:
+        if slot < len(slot_positions) and slot_positions[slot] is None:
+            return slot
+
+    return None
+
+
+class _Ranking:
+    """(-projected_points, id) keys stored best last, with lazy removal
+
+    A taken key stays in place until it reaches the end of the list, where it is
+    popped, or until taken keys make up half the list, which is then compacted.
+    This stands in for an O(log n) sorted container: a pick is amortized O(1),
+    since each O(n) compaction follows at least n/2 picks, and reads skip at most
+    as many taken keys as there are available ones.
+    """
+
+    def __init__(self, keys: List[Tuple[float, str]], taken: Set[str]):
+        self.keys = sorted(keys, reverse=True)
+        self.taken = taken
+        self.stale = 0
+
+    def __len__(self) -> int:
+        return len(self.keys) - self.stale
+
+    def discard(self):
+        """Account for one of this ranking's players having been added to taken"""
+        self.stale += 1
+        while self.keys and self.keys[-1][1] in self.taken:
+            self.keys.pop()
+            self.stale -= 1
+        if self.stale * 2 > len(self.keys):
+            self.keys = [key for key in self.keys if key[1] not in self.taken]
+            self.stale = 0
+
+    def head(self) -> Optional[Tuple[float, str]]:
+        return self.keys[-1] if self.keys else None
+
+    def available(self) -> Iterator[Tuple[float, str]]:
+        return (key for key in reversed(self.keys) if key[1] not in self.taken)
+
+
+class DraftBoard:
+    """Projection-ranked index of the players still available in one draft
+
+    Available players are ranked by projection once overall and once per position,
+    so the best player is always at the head of a ranking and a pick only marks
+    the player taken.
+    """
+
+    def __init__(self, players: Iterable[dict], taken: Iterable = ()):
+        self.players: Dict[str, dict] = {}
+        self.taken: Set[str] = set()
+
+        taken_ids = {str(player_id) for player_id in taken if player_id is not None}
+        ranked: List[Tuple[float, str]] = []
+        buckets: Dict[str, List[Tuple[float, str]]] = {}
+        for player in players:
+            player_id = str(player["_id"])
+            self.players[player_id] = player
+            if player_id in taken_ids:
+                self.taken.add(player_id)
+                continue
+            key = self._key(player_id)
+            ranked.append(key)
+            buckets.setdefault(player["position"], []).append(key)
+
+        self.ranked = _Ranking(ranked, self.taken)
+        self.buckets = {position: _Ranking(keys, self.taken) for position, keys in buckets.items()}
+
+    def _key(self, player_id: str) -> Tuple[float, str]:
+        return (-(self.players[player_id].get("projected_points") or 0.0), player_id)
+
+    def position_of(self, player_id) -> Optional[str]:
+        player = self.players.get(str(player_id)) if player_id is not None else None
+        return player["position"] if player else None
+
+    def mark_taken(self, player_id):
+        """Remove a drafted player from the overall and positional rankings"""
+        player_id = str(player_id)
+        if player_id not in self.players or player_id in self.taken:
+            return
+        self.taken.add(player_id)
+        self.ranked.discard()
+        self.buckets[self.players[player_id]["position"]].discard()
+
+    def is_available(self, player_id) -> bool:
+        player_id = str(player_id)
+        return player_id in self.players and player_id not in self.taken
+
+    def best_available(self, positions: Optional[Iterable[str]] = None) -> Optional[dict]:
+        """Highest projected available player among the given positions (all if None)"""
+        if positions is None:
+            best = self.ranked.head()
+            return self.players[best[1]] if best else None
+
+        best = None
+        for position in positions:
+            bucket = self.buckets.get(position)
+            head = bucket.head() if bucket else None
+            if head and (best is None or head < best):
+                best = head
+        return self.players[best[1]] if best else None
+
+    def autopick(self, roster: Sequence) -> Optional[dict]:
+        """Best available player for a team's open slots: starters first, then the bench"""
+        slot_positions = [self.position_of(player_id) for player_id in roster]
+        slot_positions += [None] * (ROSTER_SIZE - len(slot_positions))
+
+        needed = set()
+        for slot, accepted in STARTER_SLOTS:
+            if slot_positions[slot] is None:
+                needed.update(accepted)
+
+        if needed:
+            player = self.best_available(needed)
+            if player:
+                return player
+
+        if any(slot_positions[slot] is None for slot in BENCH_SLOTS):
+            return self.best_available()
+
+        return None
+
+    def page(self, offset: int, limit: int, position: Optional[str] = None, name: Optional[str] = None) -> Tuple[List[dict], int]:
+        """A page of available players in projection order, plus the total matching count"""
+        ranking = self.buckets.get(position) if position else self.ranked
+        if ranking is None:
+            return [], 0
+
+        if not name:
+            keys = islice(ranking.available(), offset, offset + limit)
+            return [self.players[key[1]] for key in keys], len(ranking)
+
+        matches = PlayerSearchIndex().match(name)
+        if matches is None:
+            needle = name.lower()
+            keys = [key for key in ranking.available() if needle in self.players[key[1]]["name"].lower()]
+        else:
+            matches = {str(player_id) for player_id in matches}
+            keys = [key for key in ranking.available() if key[1] in matches]
+
+        return [self.players[key[1]] for key in keys[offset:offset + limit]], len(keys)
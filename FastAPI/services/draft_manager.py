@@ -1,10 +1,24 @@
-from fastapi import WebSocket
+from fastapi import HTTPException, WebSocket
 from datetime import datetime, timedelta
+from collections import deque
 import asyncio
-from typing import Dict, List
+import uuid
+from typing import Deque, Dict, List, Optional, Tuple
 from models.base import PyObjectId
 from utils.db import get_database
 from pymongo.errors import PyMongoError
+from services.heartbeat import HeartbeatScheduler
+from services.draft_board import DraftBoard, PLAYER_BOARD_FIELDS, ROSTER_SIZE, find_roster_slot
+from services.roster_ownership import claim_player, owned_player_ids, ownership_transaction
+from services.player_cache import PlayerCache
+from utils.response_cache import invalidate_tags
+
+DRAFT_EVENT_BUFFER = 128  # recent events kept per draft room for resyncing clients
+
+
+def _str_or_none(value) -> Optional[str]:
+    return str(value) if value is not None else None
+
 
 class DraftManager:
     _instance = None
@@ -15,6 +29,7 @@ class DraftManager:
             cls._instance.active_drafts = {}
             cls._instance.waiting_drafts = {}
             cls._instance.connections = {}
+            cls._instance.heartbeat = HeartbeatScheduler()
         return cls._instance
 
     def __init__(self):
@@ -23,6 +38,15 @@ class DraftManager:
             self.active_drafts: Dict[str, asyncio.Task] = {}
             self.waiting_drafts: Dict[str, asyncio.Task] = {}
             self.connections: Dict[str, List[WebSocket]] = {}
+            self.heartbeat = HeartbeatScheduler()
+            # Event sequencing: sequence numbers restart with the process, so every
+            # event also carries the process epoch to let clients detect the reset
+            self.epoch = uuid.uuid4().hex
+            self.event_seq: Dict[str, int] = {}
+            self.event_log: Dict[str, Deque[dict]] = {}
+            self.snapshots: Dict[str, Tuple[int, dict]] = {}
+            self.boards: Dict[str, DraftBoard] = {}
+            self.league_drafts: Dict[str, str] = {}
             self.initialized = True
     
     async def initialize_from_database(self):
@@ -65,6 +89,7 @@ class DraftManager:
         self.waiting_drafts[draft_id] = asyncio.create_task(
             self._monitor_waiting_draft(draft_id, league_id)
         )
+        await self.get_board(draft_id, league_id)
 
     async def stop_waiting_monitoring(self, draft_id: str):
         """Stop monitoring a waiting draft"""
@@ -128,6 +153,7 @@ class DraftManager:
         self.active_drafts[draft_id] = asyncio.create_task(
             self._monitor_draft(draft_id, league_id)
         )
+        await self.get_board(draft_id, league_id)
 
         db = get_database()
         draft = await db.drafts.find_one({"_id": PyObjectId(draft_id)})
@@ -138,12 +164,29 @@ class DraftManager:
                 {"$set": {"next_pick_time": next_pick_time}}
             )
 
-    async def stop_draft_monitoring(self, draft_id: str):
+    async def stop_draft_monitoring(self, draft_id: str, league_id: Optional[str] = None):
         """Stop monitoring a draft"""
         # Remove the database update since it's now handled in the transaction
         if draft_id in self.active_drafts:
             self.active_drafts[draft_id].cancel()
             del self.active_drafts[draft_id]
+        self._drop_board(draft_id, league_id)
+
+    def _drop_board(self, draft_id: str, league_id: Optional[str] = None):
+        """Forget the in-memory state of a finished draft"""
+        self.boards.pop(draft_id, None)
+        if league_id is None:
+            league_id = next(
+                (league for league, draft in self.league_drafts.items() if draft == draft_id), None
+            )
+        if league_id is None:
+            return
+
+        self.league_drafts.pop(league_id, None)
+        # event_seq is kept so sequence numbers never go backwards within an epoch;
+        # clients that reconnect after the draft ends get a snapshot
+        self.event_log.pop(league_id, None)
+        self.snapshots.pop(league_id, None)
 
     async def _monitor_draft(self, draft_id: str, league_id: str):
         """Monitor draft and handle pick timeouts"""
@@ -169,12 +212,14 @@ class DraftManager:
             print(f"Error monitoring draft {draft_id}: {str(e)}")
 
     async def _handle_timeout(self, draft_id: str, league_id: str):
-        """Handle pick timeout by auto-skipping the current player's turn"""
+        """Handle pick timeout by autopicking the best available player for the team on the clock"""
         db = get_database()
+        picked_player = None
+        touched = [f"draft:{draft_id}", f"league:{league_id}"]
         
         try:
             async with await db.client.start_session() as session:
-                async with session.start_transaction():
+                async with ownership_transaction(session):
                     draft = await db.drafts.find_one({"_id": PyObjectId(draft_id)}, session=session)
                     if not draft:
                         return
@@ -183,6 +228,31 @@ class DraftManager:
                     current_pick = draft["current_pick"]
                     picks_per = len(draft["draft_order"])
 
+                    if current_round % 2 == 1:
+                        drafting_team_id = draft["draft_order"][current_pick - 1]
+                    else:
+                        drafting_team_id = draft["draft_order"][picks_per - current_pick]
+
+                    # Autopick from the in-memory board so absent managers still get real players
+                    board = await self.get_board(draft_id, league_id)
+                    team = await db.teams.find_one({"_id": PyObjectId(drafting_team_id)}, session=session)
+                    if team:
+                        roster = team.get("roster", [None] * ROSTER_SIZE)
+                        picked_player = board.autopick(roster)
+
+                    pick_id = None
+                    if picked_player:
+                        slot_positions = [board.position_of(player_id) for player_id in roster]
+                        slot_index = find_roster_slot(slot_positions, picked_player["position"])
+                        pick_id = picked_player["_id"]
+                        await claim_player(league_id, pick_id, team["_id"], session=session)
+                        touched.append(f"team:{team['_id']}")
+                        await db.teams.update_one(
+                            {"_id": team["_id"]},
+                            {"$set": {f"roster.{slot_index}": pick_id}},
+                            session=session
+                        )
+
                     if picks_per == current_pick:
                         current_pick = 1
                         current_round += 1
@@ -204,7 +274,7 @@ class DraftManager:
                                 "next_pick_time": next_pick_time,
                                 "status": "completed"  # Set status in same transaction
                             },
-                            "$addToSet": {"pick_list": PyObjectId()}},
+                            "$push": {"pick_list": pick_id}},
                             session=session
                         )
 
@@ -220,6 +290,7 @@ class DraftManager:
                         if draft_id in self.active_drafts:
                             self.active_drafts[draft_id].cancel()
                             del self.active_drafts[draft_id]
+                        self._drop_board(draft_id, str(league_id))
                             
                         return {"message": f"Player successfully drafted"}
 
@@ -231,7 +302,7 @@ class DraftManager:
                                 "current_pick": current_pick,
                                 "next_pick_time": next_pick_time
                             },
-                            "$push": {"pick_list": PyObjectId()}
+                            "$push": {"pick_list": pick_id}
                         },
                         session=session
                     )
@@ -239,54 +310,171 @@ class DraftManager:
                     await self.broadcast(
                         {
                             "type": "player_drafted",
-                            "player_id": str(PyObjectId()),
+                            "player_id": str(pick_id) if pick_id else "",
+                            "team_id": str(drafting_team_id),
+                            "autopick": True,
                             "next_pick_time": str(next_pick_time),
                             "next_drafter": str(next_drafter)
                         },
                         league_id
                     )
 
+            if picked_player:
+                self.mark_drafted(draft_id, picked_player["_id"])
+
+        except HTTPException:
+            # Picked up elsewhere since the board was built; skip them and retry next tick
+            if picked_player:
+                self.mark_drafted(draft_id, picked_player["_id"])
         except PyMongoError as e:
             print(f"Database error handling timeout: {str(e)}")
+        finally:
+            await invalidate_tags(*touched)
+
+    async def get_board(self, draft_id: str, league_id: str, cache: bool = True) -> DraftBoard:
+        """Projection-ranked availability index for a draft, built once per live draft"""
+        board = self.boards.get(draft_id)
+        if board is not None:
+            return board
+
+        player_cache = PlayerCache()
+        if player_cache.loaded:
+            players = [
+                {field: player[field] for field in PLAYER_BOARD_FIELDS if field in player}
+                for player in player_cache.find()
+            ]
+        else:
+            db = get_database()
+            players = await db.nflplayers.find({}, PLAYER_BOARD_FIELDS).to_list(None)
+        taken = await owned_player_ids(league_id)
+
+        board = DraftBoard(players, taken)
+        if cache:
+            self.boards[draft_id] = board
+            self.league_drafts[league_id] = draft_id
+        return board
+
+    def get_league_board(self, league_id: str) -> Optional[DraftBoard]:
+        """The in-memory board of a league's live draft, if there is one"""
+        draft_id = self.league_drafts.get(league_id)
+        return self.boards.get(draft_id) if draft_id else None
+
+    def mark_drafted(self, draft_id: str, player_id):
+        """Remove a drafted player from the draft's availability index"""
+        board = self.boards.get(draft_id)
+        if board is not None:
+            board.mark_taken(player_id)
 
     async def connect_client(self, websocket: WebSocket, league_id: str):
-        """Register a new client connection and start heartbeat"""
+        """Register a new client connection with the shared heartbeat"""
         await websocket.accept()
         if league_id not in self.connections:
             self.connections[league_id] = []
         self.connections[league_id].append(websocket)
-        
-        asyncio.create_task(self._heartbeat(websocket, league_id))
 
-    async def _heartbeat(self, websocket: WebSocket, league_id: str):
-        """Send periodic pings to keep the connection alive"""
-        try:
-            while True:
-                await asyncio.sleep(30)  # Send ping every 30 seconds
-                try:
-                    await websocket.send_json({"type": "ping"})
-                except:
-                    await self.disconnect_client(websocket, league_id)
-                    break
-        except asyncio.CancelledError:
-            pass
+        async def on_dead(dead_socket: WebSocket):
+            await self.disconnect_client(dead_socket, league_id)
+
+        self.heartbeat.register(websocket, on_dead)
+
+        await websocket.send_json({
+            "type": "sync",
+            "seq": self.event_seq.get(league_id, 0),
+            "epoch": self.epoch
+        })
+
+    def touch_client(self, websocket: WebSocket):
+        """Mark a client as alive after it sends us a message"""
+        self.heartbeat.touch(websocket)
 
     async def disconnect_client(self, websocket: WebSocket, league_id: str):
         """Remove a client connection"""
+        self.heartbeat.unregister(websocket)
         if league_id in self.connections:
-            self.connections[league_id].remove(websocket)
+            self.connections[league_id] = [
+                connection for connection in self.connections[league_id] if connection is not websocket
+            ]
+            if not self.connections[league_id]:
+                del self.connections[league_id]
+
+    def _record_event(self, message: dict, league_id: str) -> dict:
+        """Stamp a draft event with the next sequence number and keep it for replays"""
+        seq = self.event_seq.get(league_id, 0) + 1
+        self.event_seq[league_id] = seq
+
+        event = {**message, "seq": seq, "epoch": self.epoch}
+        if league_id not in self.event_log:
+            self.event_log[league_id] = deque(maxlen=DRAFT_EVENT_BUFFER)
+        self.event_log[league_id].append(event)
+        return event
+
+    async def resync_client(self, websocket: WebSocket, league_id: str, last_seq: Optional[int], epoch: Optional[str]):
+        """Replay the events a client missed, or send a snapshot if it is too far behind"""
+        current_seq = self.event_seq.get(league_id, 0)
+        events = self.event_log.get(league_id, ())
+
+        if epoch == self.epoch and last_seq is not None and 0 <= last_seq <= current_seq:
+            missed = [event for event in events if event["seq"] > last_seq]
+            if last_seq == current_seq or (missed and missed[0]["seq"] == last_seq + 1):
+                for event in missed:
+                    await websocket.send_json(event)
+                return
+
+        snapshot = await self.get_snapshot(league_id)
+        await websocket.send_json(snapshot)
+
+    async def get_snapshot(self, league_id: str) -> dict:
+        """Compact draft state for a league, cached until the next event"""
+        current_seq = self.event_seq.get(league_id, 0)
+        cached = self.snapshots.get(league_id)
+        if cached and cached[0] == current_seq:
+            return cached[1]
+
+        db = get_database()
+        draft = await db.drafts.find_one(
+            {"league": PyObjectId(league_id)},
+            {
+                "status": 1, "current_round": 1, "current_pick": 1, "total_rounds": 1,
+                "next_pick_time": 1, "time_per_pick": 1, "draft_order": 1, "pick_list": 1
+            }
+        )
+
+        snapshot = {
+            "type": "snapshot",
+            "seq": current_seq,
+            "epoch": self.epoch,
+            "draft": None
+        }
+        if draft:
+            snapshot["draft"] = {
+                "_id": str(draft["_id"]),
+                "status": draft.get("status"),
+                "current_round": draft.get("current_round"),
+                "current_pick": draft.get("current_pick"),
+                "total_rounds": draft.get("total_rounds"),
+                "time_per_pick": draft.get("time_per_pick"),
+                "next_pick_time": _str_or_none(draft.get("next_pick_time")),
+                "draft_order": [_str_or_none(team_id) for team_id in draft.get("draft_order", [])],
+                # Skipped or failed autopicks leave None in pick_list
+                "pick_list": [_str_or_none(player_id) for player_id in draft.get("pick_list", [])]
+            }
+
+        self.snapshots[league_id] = (current_seq, snapshot)
+        return snapshot
 
     async def broadcast(self, message: dict, league_id: str):
-        """Broadcast message to all connected clients in a league"""
+        """Sequence a draft event and broadcast it to all connected clients in a league"""
+        event = self._record_event(message, league_id)
+
         if league_id not in self.connections:
             return
             
         disconnected = []
         for connection in self.connections[league_id]:
             try:
-                await connection.send_json(message)
+                await connection.send_json(event)
             except:
                 disconnected.append(connection)
                 
         for connection in disconnected:
-            await self.disconnect_client(connection, league_id)
\ No newline at end of file
+            await self.disconnect_client(connection, league_id)
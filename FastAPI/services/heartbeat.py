@@ -0,0 +1,104 @@
+from fastapi import WebSocket
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+HEARTBEAT_INTERVAL = 30  # seconds between ping rounds
+HEARTBEAT_TIMEOUT = 90   # seconds without a message before a socket is reaped
+HEARTBEAT_BATCH_SIZE = 200
+
+
+class _Connection:
+    __slots__ = ("websocket", "on_dead", "last_seen")
+
+    def __init__(self, websocket: WebSocket, on_dead: Optional[Callable[[WebSocket], Awaitable[None]]]):
+        self.websocket = websocket
+        self.on_dead = on_dead
+        self.last_seen = time.monotonic()
+
+
+class HeartbeatScheduler:
+    """One ping loop per process for every registered websocket"""
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, 'initialized'):
+            # Starlette websockets are not hashable, so connections are keyed by id()
+            self.connections: Dict[int, _Connection] = {}
+            self.heartbeat_task: Optional[asyncio.Task] = None
+            self.initialized = True
+
+    def register(self, websocket: WebSocket, on_dead: Optional[Callable[[WebSocket], Awaitable[None]]] = None):
+        """Track a socket; on_dead is awaited once if the socket is reaped"""
+        self.connections[id(websocket)] = _Connection(websocket, on_dead)
+        self.start()
+
+    def unregister(self, websocket: WebSocket):
+        """Stop tracking a socket that was closed normally"""
+        self.connections.pop(id(websocket), None)
+
+    def touch(self, websocket: WebSocket):
+        """Record that the client has just been heard from"""
+        connection = self.connections.get(id(websocket))
+        if connection:
+            connection.last_seen = time.monotonic()
+
+    def start(self):
+        """Start the shared heartbeat loop if it is not already running"""
+        if self.heartbeat_task is None or self.heartbeat_task.done():
+            self.heartbeat_task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.sleep(HEARTBEAT_INTERVAL)
+                await self._beat()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                print(f"Error in websocket heartbeat: {e}")
+
+    async def _beat(self):
+        """Ping every live socket in batches and reap the ones that went quiet"""
+        now = time.monotonic()
+        connections: List[_Connection] = list(self.connections.values())
+
+        for start in range(0, len(connections), HEARTBEAT_BATCH_SIZE):
+            batch = connections[start:start + HEARTBEAT_BATCH_SIZE]
+            await asyncio.gather(*(self._ping(connection, now) for connection in batch))
+
+    async def _ping(self, connection: _Connection, now: float):
+        if now - connection.last_seen > HEARTBEAT_TIMEOUT:
+            await self._reap(connection)
+            return
+
+        try:
+            await asyncio.wait_for(connection.websocket.send_json({"type": "ping"}), timeout=HEARTBEAT_INTERVAL)
+        except Exception:
+            await self._reap(connection)
+
+    async def _reap(self, connection: _Connection):
+        if self.connections.pop(id(connection.websocket), None) is None:
+            return
+
+        try:
+            await connection.websocket.close()
+        except Exception:
+            pass
+
+        if connection.on_dead:
+            try:
+                await connection.on_dead(connection.websocket)
+            except Exception as e:
+                print(f"Error reaping websocket: {e}")
+
+    def cleanup(self):
+        """Cancel the background task"""
+        if self.heartbeat_task:
+            self.heartbeat_task.cancel()
+        self.connections.clear()
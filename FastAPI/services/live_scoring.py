@@ -0,0 +1,218 @@
+from fastapi import WebSocket
+import asyncio
+from typing import Dict, List, Set, Tuple
+from pymongo import UpdateOne
+from utils.db import get_database
+from models.base import PyObjectId
+from models.league import to_points
+from services.heartbeat import HeartbeatScheduler
+from services.player_events import LIVE_WEEK_CHANNEL, PlayerEventListener
+from utils.redis_client import get_redis
+
+STARTER_COUNT = 9
+# Every API process applies each scrape event; the first to claim it writes the scores
+PERSIST_CLAIM_PREFIX = "live_scoring:persist"
+PERSIST_CLAIM_SECONDS = 300
+
+
+class LiveScoringService:
+    """Keeps started matchups' scores current from the scraper's changed-player feed"""
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, 'initialized'):
+            # player id -> (matchup id, "a" | "b") for every started matchup that starts them
+            self.starters: Dict[str, Set[Tuple[str, str]]] = {}
+            # matchup id -> {"league", "week", "team_a_score", "team_b_score"}
+            self.matchups: Dict[str, dict] = {}
+            # player id -> points counted for them in the current live week
+            self.points: Dict[str, float] = {}
+            self.connections: Dict[str, List[WebSocket]] = {}
+            self.heartbeat = HeartbeatScheduler()
+            self.lock = asyncio.Lock()
+            self.initialized = True
+
+    async def initialize(self):
+        """Build the reverse index and start listening for scrape updates"""
+        await self.rebuild()
+        listener = PlayerEventListener()
+        listener.subscribe(self.apply_updates)
+        listener.subscribe(self.apply_live_week, LIVE_WEEK_CHANNEL)
+        await listener.initialize()
+        print(f"Live scoring tracking {len(self.matchups)} matchups")
+
+    async def rebuild(self):
+        """Index every started matchup by its starters and recompute the scores"""
+        db = get_database()
+        async with self.lock:
+            matchups = await db.matchups.find(
+                {"status": "started"},
+                {"league": 1, "week": 1, "team_a_roster": 1, "team_b_roster": 1}
+            ).to_list(None)
+
+            starters: Dict[str, Set[Tuple[str, str]]] = {}
+            for matchup in matchups:
+                matchup_id = str(matchup["_id"])
+                for side in ("a", "b"):
+                    for player_id in matchup[f"team_{side}_roster"][:STARTER_COUNT]:
+                        if player_id is not None:
+                            starters.setdefault(str(player_id), set()).add((matchup_id, side))
+
+            players = await db.nflplayers.find(
+                {"_id": {"$in": [PyObjectId(player_id) for player_id in starters]}},
+                {"weeks": 1}
+            ).to_list(None)
+            weeks_by_player = {str(player["_id"]): player.get("weeks", []) for player in players}
+
+            self.starters = starters
+            self.matchups = {}
+            self.points = {}
+            for matchup in matchups:
+                self.matchups[str(matchup["_id"])] = {
+                    "league": str(matchup["league"]),
+                    "week": matchup["week"],
+                    "team_a_score": 0.0,
+                    "team_b_score": 0.0
+                }
+
+            for player_id, slots in starters.items():
+                for matchup_id, side in slots:
+                    matchup = self.matchups[matchup_id]
+                    weeks = weeks_by_player.get(player_id, [])
+                    points = to_points(weeks[matchup["week"] - 1]) if len(weeks) >= matchup["week"] else 0.0
+                    self.points[player_id] = points
+                    matchup[f"team_{side}_score"] += points
+
+    async def apply_live_week(self, event: dict):
+        """Rebuild or clear the index when any process activates or finalizes a week"""
+        if event.get("live"):
+            await self.rebuild()
+        else:
+            self.clear()
+
+    async def apply_updates(self, event: dict):
+        """Apply a scrape's changed players to only the matchups that start them"""
+        week = event.get("week")
+        changed: Dict[str, dict] = {}
+
+        async with self.lock:
+            for update in event.get("players", []):
+                player_id = update["_id"]
+                slots = self.starters.get(player_id)
+                if not slots:
+                    continue
+
+                points = to_points(update.get("points"))
+                delta = points - self.points.get(player_id, 0.0)
+                if delta == 0:
+                    continue
+                self.points[player_id] = points
+
+                for matchup_id, side in slots:
+                    matchup = self.matchups.get(matchup_id)
+                    if not matchup or matchup["week"] != week:
+                        continue
+                    matchup[f"team_{side}_score"] += delta
+                    entry = changed.setdefault(matchup_id, {
+                        "matchup_id": matchup_id,
+                        "league": matchup["league"],
+                        "players": {}
+                    })
+                    entry["players"][player_id] = points
+
+            for matchup_id, entry in changed.items():
+                entry["team_a_score"] = round(self.matchups[matchup_id]["team_a_score"], 2)
+                entry["team_b_score"] = round(self.matchups[matchup_id]["team_b_score"], 2)
+
+        if not changed:
+            return
+
+        if await self._claim_persist(event):
+            db = get_database()
+            await db.matchups.bulk_write([
+                UpdateOne(
+                    {"_id": PyObjectId(matchup_id), "status": "started"},
+                    {"$set": {"team_a_score": entry["team_a_score"], "team_b_score": entry["team_b_score"]}}
+                )
+                for matchup_id, entry in changed.items()
+            ], ordered=False)
+
+        by_league: Dict[str, List[dict]] = {}
+        for entry in changed.values():
+            league_id = entry.pop("league")
+            by_league.setdefault(league_id, []).append(entry)
+
+        for league_id, deltas in by_league.items():
+            await self.broadcast({"type": "score_update", "week": week, "matchups": deltas}, league_id)
+
+    def clear(self):
+        """Forget all live matchups once the week has been finalized"""
+        self.starters = {}
+        self.matchups = {}
+        self.points = {}
+
+    @staticmethod
+    async def _claim_persist(event: dict) -> bool:
+        """Whether this process should write an event's scores; falls back to writing if Redis is down"""
+        event_id = event.get("id")
+        if not event_id:
+            return True
+        try:
+            return bool(await get_redis().set(
+                f"{PERSIST_CLAIM_PREFIX}:{event_id}", 1, nx=True, ex=PERSIST_CLAIM_SECONDS
+            ))
+        except Exception as e:
+            print(f"Could not claim live score write, writing anyway: {e}")
+            return True
+
+    async def connect_client(self, websocket: WebSocket, league_id: str):
+        """Register a client for a league's live scores"""
+        await websocket.accept()
+        self.connections.setdefault(league_id, []).append(websocket)
+
+        async def on_dead(dead_socket: WebSocket):
+            await self.disconnect_client(dead_socket, league_id)
+
+        self.heartbeat.register(websocket, on_dead)
+
+        await websocket.send_json({
+            "type": "scores",
+            "matchups": [
+                {
+                    "matchup_id": matchup_id,
+                    "team_a_score": round(matchup["team_a_score"], 2),
+                    "team_b_score": round(matchup["team_b_score"], 2)
+                }
+                for matchup_id, matchup in self.matchups.items() if matchup["league"] == league_id
+            ]
+        })
+
+    def touch_client(self, websocket: WebSocket):
+        self.heartbeat.touch(websocket)
+
+    async def disconnect_client(self, websocket: WebSocket, league_id: str):
+        """Remove a client connection"""
+        self.heartbeat.unregister(websocket)
+        if league_id in self.connections:
+            self.connections[league_id] = [
+                connection for connection in self.connections[league_id] if connection is not websocket
+            ]
+            if not self.connections[league_id]:
+                del self.connections[league_id]
+
+    async def broadcast(self, message: dict, league_id: str):
+        """Send a score delta to every client watching a league"""
+        disconnected = []
+        for connection in self.connections.get(league_id, []):
+            try:
+                await connection.send_json(message)
+            except:
+                disconnected.append(connection)
+
+        for connection in disconnected:
+            await self.disconnect_client(connection, league_id)
@@ -1,7 +1,32 @@
-from datetime import datetime, time, timezone
+from datetime import datetime, time, timedelta, timezone
 import asyncio
+from typing import List, Optional, Tuple
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
 from utils.db import get_database
 from models.base import PyObjectId
+from models.team import empty_roster
+from services.live_scoring import LiveScoringService
+from services.player_events import publish_live_week_change
+from services.standings import apply_matchup_results
+from services.week_tasks import dispatch_week_job, wait_for_week_run
+from utils.response_cache import invalidate_tags
+
+ACTIVATION_BATCH_SIZE = 500  # leagues per bulk activation round
+COMPLETION_BATCH_SIZE = 1000  # matchups per bulk completion round
+
+ACTIVATE_JOB = "activate_matchups"
+COMPLETE_JOB = "complete_matchups"
+# job -> (weekday, UTC time) of its weekly deadline
+JOB_SCHEDULE = {
+    ACTIVATE_JOB: (3, time(19, 30, tzinfo=timezone.utc)),  # Thursday 7:30 PM
+    COMPLETE_JOB: (1, time(6, 0, tzinfo=timezone.utc)),    # Tuesday 6:00 AM
+}
+JOB_LEASE_SECONDS = 3600  # a run that has not finished by then may be retaken
+JOB_RETRY_SECONDS = 300  # first retry delay, doubled after each failed attempt
+JOB_RETRY_MAX_SECONDS = 3600
+JOB_MAX_ATTEMPTS = 6  # then the deadline is given up and left failed
+JOB_CATCH_UP_WEEKS = 4  # never replay deadlines older than this
 
 class MatchupManager:
     _instance = None
@@ -20,157 +45,394 @@ class MatchupManager:
     async def initialize(self):
         """Initialize the matchup manager and start background task"""
         self.db = get_database()
-        self.matchup_check_task = asyncio.create_task(self._check_matchup_activation())
+        self.matchup_check_task = asyncio.create_task(self._run_schedule())
         print("Matchup manager initialized")
 
-    def is_matchup_time(self) -> bool:
-        """Check if it's time to activate matchups (Thursday 7:30 PM UTC)"""
-        current_time = datetime.now(timezone.utc)
+    @staticmethod
+    def previous_deadline(job: str, now: datetime) -> datetime:
+        """Most recent deadline of a weekly job at or before now"""
+        weekday, at = JOB_SCHEDULE[job]
+        deadline = datetime.combine(now.date(), at) - timedelta(days=(now.weekday() - weekday) % 7)
+        if deadline > now:
+            deadline -= timedelta(weeks=1)
+        return deadline
 
-        if current_time.weekday() != 3:
-            return False
-            
-        activation_time = time(19, 30, tzinfo=timezone.utc)
-        current_day_activation = datetime.combine(
-            current_time.date(),
-            activation_time
-        )
-        
-        time_difference = abs((current_time - current_day_activation).total_seconds())
-        return time_difference <= 120
+    @classmethod
+    def next_deadline(cls, now: datetime) -> Tuple[str, datetime]:
+        """The next job to run after now and when it is due"""
+        upcoming = [
+            (cls.previous_deadline(job, now) + timedelta(weeks=1), job)
+            for job in JOB_SCHEDULE
+        ]
+        deadline, job = min(upcoming)
+        return job, deadline
 
-    async def _check_matchup_activation(self):
-        """Background task to check for matchup activation times"""
+    async def _run_schedule(self):
+        """Background task that sleeps until each activation/completion deadline"""
         while True:
             try:
-                print("Check Matchup Activation")
-                if self.is_matchup_time():
-                    await self._activate_matchups()
-                
-                await asyncio.sleep(3600)
+                # Replays anything missed while down, or while a run overran the next deadline
+                await self._catch_up()
+
+                now = datetime.now(timezone.utc)
+                job, deadline = self.next_deadline(now)
+                print(f"Next matchup job: {job} at {deadline.isoformat()}")
+
+                # Sleep exactly until the deadline; re-check in case the clock moved
+                while now < deadline:
+                    await asyncio.sleep((deadline - now).total_seconds())
+                    now = datetime.now(timezone.utc)
+
+                await self._run_until_done(job, deadline)
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                print(f"Error in matchup activation check: {e}")
-                await asyncio.sleep(3600) 
+                print(f"Error in matchup scheduler: {e}")
+                await asyncio.sleep(JOB_RETRY_SECONDS)
+
+    async def _run_until_done(self, job: str, deadline: datetime):
+        """Retry one deadline with backoff until it completes here or elsewhere, or attempts run out"""
+        delay = JOB_RETRY_SECONDS
+        for attempt in range(1, JOB_MAX_ATTEMPTS + 1):
+            try:
+                if await self._run_job(job, deadline):
+                    return
+            except Exception as e:
+                print(f"Matchup job {job} for {deadline.isoformat()} failed (attempt {attempt}): {e}")
+            if attempt < JOB_MAX_ATTEMPTS:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, JOB_RETRY_MAX_SECONDS)
+
+        # Leave it failed, and stop catch-up from replaying it; an operator can rerun it
+        key = f"{job}:{deadline.isoformat()}"
+        await self.db.scheduled_jobs.update_one(
+            {"_id": key, "status": "failed"},
+            {"$set": {"abandoned": True, "attempts": JOB_MAX_ATTEMPTS}}
+        )
+        print(f"Gave up on matchup job {key} after {JOB_MAX_ATTEMPTS} attempts")
+
+    async def _catch_up(self):
+        """Replay every missed deadline since the last finished run, oldest first"""
+        now = datetime.now(timezone.utc)
+        last = await self.db.scheduled_jobs.find_one(
+            {"$or": [{"status": {"$in": ["completed", "skipped"]}}, {"abandoned": True}]},
+            sort=[("deadline", -1)]
+        )
+        if last is None:
+            # First run: record the latest deadlines as seen instead of replaying them,
+            # so a mid-week deploy does not activate or complete a week early
+            for job in JOB_SCHEDULE:
+                await self._skip_job(job, self.previous_deadline(job, now))
+            return
+        since = last["deadline"].replace(tzinfo=timezone.utc)
 
-    async def _activate_matchups(self):
-        """Activate matchups for all leagues"""
+        missed = sorted(
+            (self.previous_deadline(job, now) - timedelta(weeks=weeks), job)
+            for job in JOB_SCHEDULE
+            for weeks in range(JOB_CATCH_UP_WEEKS)
+        )
+        missed = [(deadline, job) for deadline, job in missed if deadline > since]
+
+        for index, (deadline, job) in enumerate(missed):
+            # Activation snapshots the league's current week, so replaying one whose
+            # completion has also passed would score a week that has not been played
+            superseded = any(later_job == COMPLETE_JOB for _, later_job in missed[index + 1:])
+            if job == ACTIVATE_JOB and superseded:
+                await self._skip_job(job, deadline)
+            else:
+                await self._run_until_done(job, deadline)
+
+    async def _skip_job(self, job: str, deadline: datetime):
+        """Record a missed deadline as deliberately not run"""
+        key = f"{job}:{deadline.isoformat()}"
         try:
-            # Get all leagues
-            leagues = await self.db.leagues.find({}).to_list(None)
-            
-            for league in leagues:
-                current_week = league["week"]
-                start_week = 18 - len(league["schedule"]) + 1
-                if current_week - start_week < 0:
-                    continue # this league has not started yet
-                matchups = league["schedule"][current_week - start_week]
-
-                for matchup_id in matchups:
-                    matchup = await self.db.matchups.find_one({"_id": PyObjectId(matchup_id)})
-                    if matchup:
-                        team_a = await self.db.teams.find_one({"_id": PyObjectId(matchup["team_a"])})
-                        if not team_a:
-                            team_a = {"roster": [PyObjectId() for _ in range(17)]}
-                        team_b = await self.db.teams.find_one({"_id": PyObjectId(matchup["team_b"])})
-                        if not team_b:
-                            team_b = {"roster": [PyObjectId() for _ in range(17)]}
-                        await self.db.matchups.update_one(
-                            {"_id": PyObjectId(matchup_id)},
-                            {"$set": {
-                                "status": "started",
-                                "team_a_roster": team_a["roster"],
-                                "team_b_roster": team_b["roster"]
-                            }}
-                        )
-            print(f"Activated matchups for {len(leagues)} leagues")
+            await self.db.scheduled_jobs.update_one(
+                {"_id": key, "status": "failed"},
+                {"$set": {"job": job, "deadline": deadline, "status": "skipped"}},
+                upsert=True
+            )
+            print(f"Skipped matchup job {key}")
+        except DuplicateKeyError:
+            pass
+
+    async def _run_job(self, job: str, deadline: datetime) -> bool:
+        """Run a job once per deadline, recording the run in Mongo for idempotency
+
+        Returns False when another process holds a live claim on the run.
+        """
+        key = f"{job}:{deadline.isoformat()}"
+        now = datetime.now(timezone.utc)
+
+        # Claim the run; completed runs and live leases make the upsert collide on _id
+        try:
+            await self.db.scheduled_jobs.update_one(
+                {
+                    "_id": key,
+                    "$or": [
+                        {"status": "failed"},
+                        {"status": "running", "lease_until": {"$lt": now}}
+                    ]
+                },
+                {"$set": {
+                    "job": job,
+                    "deadline": deadline,
+                    "status": "running",
+                    "started_at": now,
+                    "lease_until": now + timedelta(seconds=JOB_LEASE_SECONDS)
+                }},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            run = await self.db.scheduled_jobs.find_one({"_id": key}, {"status": 1})
+            print(f"Matchup job {key} is {run['status'] if run else 'claimed'} elsewhere")
+            return run is not None and run["status"] in ("completed", "skipped")
+
+        try:
+            # Finalization runs on the Celery workers, sharded by league; the API
+            # process only coordinates and falls back to running it inline when no
+            # broker or worker is reachable.
+            try:
+                await dispatch_week_job(key, job)
+            except Exception as e:
+                print(f"Could not dispatch {key} to workers, running in process: {e}")
+                await self.run_job_shard(job)
+            else:
+                await wait_for_week_run(key, timeout=JOB_LEASE_SECONDS)
+
+            # Live scores are held in every API process; refresh this one directly
+            # only if the others could not be told (they would tell us too)
+            live = job == ACTIVATE_JOB
+            if not await publish_live_week_change(live):
+                await LiveScoringService().apply_live_week({"live": live})
+            # Every league's matchups and team records moved at once
+            await invalidate_tags("matchups", "teams", "leagues")
+        except Exception as e:
+            await self.db.scheduled_jobs.update_one(
+                {"_id": key},
+                {"$set": {"status": "failed", "error": str(e)}}
+            )
+            raise
+
+        await self.db.scheduled_jobs.update_one(
+            {"_id": key},
+            {"$set": {"status": "completed", "completed_at": datetime.now(timezone.utc)}}
+        )
+        return True
+
+    async def run_job_shard(self, job: str, league_range: Optional[Tuple[Optional[str], Optional[str]]] = None):
+        """Run one job for the leagues in [lower, upper), or for every league"""
+        if self.db is None:
+            self.db = get_database()
+        if job == ACTIVATE_JOB:
+            await self._activate_matchups(league_range)
+        else:
+            await self.complete_active_matchups(league_range)
+
+    @staticmethod
+    def _league_range_filter(league_range: Optional[Tuple[Optional[str], Optional[str]]]) -> dict:
+        if not league_range:
+            return {}
+        lower, upper = league_range
+        bounds = {}
+        if lower:
+            bounds["$gte"] = PyObjectId(lower)
+        if upper:
+            bounds["$lt"] = PyObjectId(upper)
+        return bounds
+
+    async def _activate_matchups(self, league_range: Optional[Tuple[Optional[str], Optional[str]]] = None):
+        """Activate matchups for all leagues, or the leagues in a shard's id range"""
+        try:
+            bounds = self._league_range_filter(league_range)
+            query = {"_id": bounds} if bounds else {}
+            # Stream leagues instead of loading them all, and activate them in batches
+            cursor = self.db.leagues.find(query, {"week": 1, "schedule": 1}).batch_size(ACTIVATION_BATCH_SIZE)
+            batch = []
+            league_count = 0
+            matchup_count = 0
+
+            async for league in cursor:
+                batch.append(league)
+                if len(batch) >= ACTIVATION_BATCH_SIZE:
+                    matchup_count += await self._activate_league_batch(batch)
+                    league_count += len(batch)
+                    batch = []
+
+            if batch:
+                matchup_count += await self._activate_league_batch(batch)
+                league_count += len(batch)
+
+            print(f"Activated {matchup_count} matchups for {league_count} leagues")
             
         except Exception as e:
             print(f"Error activating matchups: {e}")
+            raise
+
+    async def _activate_league_batch(self, leagues: List[dict]) -> int:
+        """Snapshot both rosters into this week's matchups for a batch of leagues"""
+        matchup_ids = []
+        for league in leagues:
+            current_week = league["week"]
+            start_week = 18 - len(league["schedule"]) + 1
+            if current_week - start_week < 0 or current_week - start_week >= len(league["schedule"]):
+                continue # this league has not started yet
+            matchup_ids.extend(PyObjectId(matchup_id) for matchup_id in league["schedule"][current_week - start_week])
 
-    async def complete_active_matchups(self):
-        """Complete all currently active matchups"""
+        if not matchup_ids:
+            return 0
+
+        matchups = await self.db.matchups.find(
+            {"_id": {"$in": matchup_ids}, "status": "scheduled"},
+            {"team_a": 1, "team_b": 1}
+        ).to_list(None)
+
+        team_ids = set()
+        for matchup in matchups:
+            team_ids.add(PyObjectId(matchup["team_a"]))
+            team_ids.add(PyObjectId(matchup["team_b"]))
+
+        teams = await self.db.teams.find(
+            {"_id": {"$in": list(team_ids)}},
+            {"roster": 1}
+        ).to_list(None)
+        rosters = {team["_id"]: team["roster"] for team in teams}
+
+        updates = []
+        for matchup in matchups:
+            team_a_roster = rosters.get(PyObjectId(matchup["team_a"])) or empty_roster()
+            team_b_roster = rosters.get(PyObjectId(matchup["team_b"])) or empty_roster()
+            updates.append(UpdateOne(
+                {"_id": matchup["_id"]},
+                {"$set": {
+                    "status": "started",
+                    "team_a_roster": team_a_roster,
+                    "team_b_roster": team_b_roster
+                }}
+            ))
+
+        if updates:
+            await self.db.matchups.bulk_write(updates, ordered=False)
+        return len(updates)
+
+    async def complete_active_matchups(self, league_range: Optional[Tuple[Optional[str], Optional[str]]] = None):
+        """Complete all currently active matchups, or those of the leagues in a shard's id range"""
         try:
-            matchups = await self.db.matchups.find({"status": "started"}).to_list(None)
-
-            for matchup in matchups:
-                print(matchup)
-                active_a = matchup['team_a_roster'][:9]
-                active_b = matchup['team_b_roster'][:9]
-                a_total = 0
-                b_total = 0
-                week = matchup['week']
-
-                for i in range(len(active_a)):
-                    playa = await self.db.nflplayers.find_one({"_id": PyObjectId(active_a[i])})
-                    if playa:
-                        a_total += playa['weeks'][week - 1]
-
-                    playb = await self.db.nflplayers.find_one({"_id": PyObjectId(active_b[i])})
-                    if playb:
-                        b_total += playb['weeks'][week - 1]
-                
-                winner = 'tie'
-                team_a = await self.db.teams.find_one({"_id": PyObjectId(matchup['team_a'])})
-                team_b = await self.db.teams.find_one({"_id": PyObjectId(matchup['team_b'])})
-                if not team_a or not team_b:
-                    await self.db.matchups.update_one(
-                    {'_id': PyObjectId(matchup["_id"])},
-                        {"$set": {
-                            "team_a_score": a_total,
-                            "team_b_score": b_total,
-                            "status": "completed"
-                        }}
-                    )
-                    return
+            query = {"status": "started"}
+            bounds = self._league_range_filter(league_range)
+            if bounds:
+                query["league"] = bounds
+            cursor = self.db.matchups.find(
+                query,
+                {"league": 1, "week": 1, "team_a": 1, "team_b": 1, "team_a_roster": 1, "team_b_roster": 1}
+            ).batch_size(COMPLETION_BATCH_SIZE)
+            batch = []
+            completed = 0
 
-                if a_total > b_total:
-                    winner = matchup['team_a']
-                    await self.db.teams.update_one(
-                        {'_id': PyObjectId(matchup['team_a'])},
-                        {"$inc": {
-                            "wins": 1,
-                            "total_points": a_total
-                        }}
-                    )
-
-                    await self.db.teams.update_one(
-                        {'_id': PyObjectId(matchup['team_b'])},
-                        {"$inc": {
-                            "losses": 1,
-                            "total_points": b_total
-                        }}
-                    )
-                elif a_total < b_total:
-                    winner = matchup['team_b']
-                    await self.db.teams.update_one(
-                        {'_id': PyObjectId(matchup['team_a'])},
-                        {"$inc": {
-                            "losses": 1,
-                            "total_points": a_total
-                        }}
-                    )
-
-                    await self.db.teams.update_one(
-                        {'_id': PyObjectId(matchup['team_b'])},
-                        {"$inc": {
-                            "wins": 1,
-                            "total_points": b_total
-                        }}
-                    )
-                
-                await self.db.matchups.update_one(
-                    {'_id': PyObjectId(matchup["_id"])},
+            async for matchup in cursor:
+                batch.append(matchup)
+                if len(batch) >= COMPLETION_BATCH_SIZE:
+                    completed += await self._complete_matchup_batch(batch)
+                    batch = []
+
+            if batch:
+                completed += await self._complete_matchup_batch(batch)
+
+            print(f"Completed {completed} matchups")
+        except Exception as e:
+            print(f"Error completing matchups: {e}")
+            raise
+
+    async def _complete_matchup_batch(self, matchups: List[dict]) -> int:
+        """Score a batch of matchups from one bulk player load and write the results in bulk"""
+        player_ids = set()
+        team_ids = set()
+        for matchup in matchups:
+            for player_id in matchup["team_a_roster"][:9] + matchup["team_b_roster"][:9]:
+                if player_id is not None:
+                    player_ids.add(PyObjectId(player_id))
+            team_ids.add(PyObjectId(matchup["team_a"]))
+            team_ids.add(PyObjectId(matchup["team_b"]))
+
+        players = await self.db.nflplayers.find(
+            {"_id": {"$in": list(player_ids)}},
+            {"weeks": 1}
+        ).to_list(None)
+        weekly_points = {player["_id"]: player.get("weeks", []) for player in players}
+
+        teams = await self.db.teams.find({"_id": {"$in": list(team_ids)}}, {"_id": 1}).to_list(None)
+        existing_teams = {team["_id"] for team in teams}
+
+        def score(roster: list, week: int) -> float:
+            total = 0
+            for player_id in roster[:9]:
+                weeks = weekly_points.get(player_id)
+                if weeks and len(weeks) >= week:
+                    total += weeks[week - 1]
+            return total
+
+        matchup_updates = []
+        team_updates = []
+        results = []
+        for matchup in matchups:
+            week = matchup["week"]
+            a_total = score(matchup["team_a_roster"], week)
+            b_total = score(matchup["team_b_roster"], week)
+            team_a_id = PyObjectId(matchup["team_a"])
+            team_b_id = PyObjectId(matchup["team_b"])
+
+            # BYE weeks: one side has no team, so only the scores are recorded
+            if team_a_id not in existing_teams or team_b_id not in existing_teams:
+                matchup_updates.append(UpdateOne(
+                    {"_id": matchup["_id"], "status": "started"},
                     {"$set": {
                         "team_a_score": a_total,
                         "team_b_score": b_total,
-                        "status": "completed",
-                        "winner": winner
+                        "status": "completed"
                     }}
-                )
-        except Exception as e:
-            print(f"Error completing matchups: {e}")
+                ))
+                continue
+
+            winner = 'tie'
+            if a_total > b_total:
+                winner = matchup['team_a']
+                team_updates.append(UpdateOne({"_id": team_a_id}, {"$inc": {"wins": 1, "total_points": a_total}}))
+                team_updates.append(UpdateOne({"_id": team_b_id}, {"$inc": {"losses": 1, "total_points": b_total}}))
+            elif a_total < b_total:
+                winner = matchup['team_b']
+                team_updates.append(UpdateOne({"_id": team_a_id}, {"$inc": {"losses": 1, "total_points": a_total}}))
+                team_updates.append(UpdateOne({"_id": team_b_id}, {"$inc": {"wins": 1, "total_points": b_total}}))
+
+            matchup_updates.append(UpdateOne(
+                {"_id": matchup["_id"], "status": "started"},
+                {"$set": {
+                    "team_a_score": a_total,
+                    "team_b_score": b_total,
+                    "status": "completed",
+                    "winner": winner
+                }}
+            ))
+            results.append({
+                "matchup": matchup["_id"],
+                "league": matchup["league"],
+                "week": week,
+                "team_a": team_a_id,
+                "team_b": team_b_id,
+                "team_a_score": a_total,
+                "team_b_score": b_total
+            })
+
+        # Results, records and standings land together or not at all, and only for
+        # matchups still started, so a retry or a concurrent run never counts one twice
+        async with await self.db.client.start_session() as session:
+            async with session.start_transaction():
+                if matchup_updates:
+                    written = await self.db.matchups.bulk_write(matchup_updates, ordered=False, session=session)
+                    if written.matched_count != len(matchup_updates):
+                        raise RuntimeError("Matchups were completed concurrently; retrying the batch")
+                if team_updates:
+                    await self.db.teams.bulk_write(team_updates, ordered=False, session=session)
+                await apply_matchup_results(results, session=session)
+        return len(matchup_updates)
 
     def cleanup(self):
         """Cancel the background task"""
@@ -0,0 +1,154 @@
+import asyncio
+from typing import Dict, Iterable, List, Optional
+from bson import ObjectId
+from pymongo import ReturnDocument
+from utils.db import get_database
+from services.player_events import PlayerEventListener
+from models.player import player_projection
+
+PLAYER_VERSION_ID = "nflplayers"
+PLAYER_CACHE_POLL_SECONDS = 60  # fallback when pub/sub messages are missed
+
+
+async def bump_player_version() -> int:
+    """Mark the player pool as changed; called after every committed scrape or edit"""
+    db = get_database()
+    version = await db.cache_versions.find_one_and_update(
+        {"_id": PLAYER_VERSION_ID},
+        {"$inc": {"version": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return version["version"]
+
+
+async def get_player_version() -> int:
+    db = get_database()
+    version = await db.cache_versions.find_one({"_id": PLAYER_VERSION_ID})
+    return version["version"] if version else 0
+
+
+class PlayerCache:
+    """Process-wide copy of nflplayers, indexed by id, position and team
+
+    Cached documents are shared between requests and must not be mutated.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, 'initialized'):
+            self.players: Dict[ObjectId, dict] = {}
+            self.by_position: Dict[str, List[ObjectId]] = {}
+            self.by_team: Dict[str, List[ObjectId]] = {}
+            # Dense per-version numbering of players, in _id order, for bitmaps. Every
+            # process must agree on it, so it only changes with the shared version
+            self.slot_ids: List[ObjectId] = []
+            self.slots: Dict[ObjectId, int] = {}
+            self.version = -1
+            self.loaded = False
+            self.lock = asyncio.Lock()
+            self.watch_task: Optional[asyncio.Task] = None
+            self.initialized = True
+
+    async def initialize(self):
+        """Load the player pool and keep it in step with the scraper"""
+        await self.refresh()
+        PlayerEventListener().subscribe(self._on_player_updates)
+        if self.watch_task is None or self.watch_task.done():
+            self.watch_task = asyncio.create_task(self._watch_version())
+        print(f"Player cache loaded {len(self.players)} players at version {self.version}")
+
+    async def refresh(self):
+        """Reload every player and rebuild the secondary indexes"""
+        db = get_database()
+        async with self.lock:
+            version = await get_player_version()
+            players: Dict[ObjectId, dict] = {}
+            by_position: Dict[str, List[ObjectId]] = {}
+            by_team: Dict[str, List[ObjectId]] = {}
+            async for player in db.nflplayers.find({}):
+                players[player["_id"]] = player
+                by_position.setdefault(player.get("position"), []).append(player["_id"])
+                by_team.setdefault(player.get("team"), []).append(player["_id"])
+
+            self.players = players
+            self.by_position = by_position
+            self.by_team = by_team
+            if version != self.version:
+                self.slot_ids = sorted(players)
+                self.slots = {player_id: slot for slot, player_id in enumerate(self.slot_ids)}
+            self.version = version
+            self.loaded = True
+
+    async def _on_player_updates(self, event: dict):
+        version = event.get("version")
+        if version is None or version > self.version:
+            await self.refresh()
+
+    async def _watch_version(self):
+        while True:
+            try:
+                await asyncio.sleep(PLAYER_CACHE_POLL_SECONDS)
+                if await get_player_version() != self.version:
+                    await self.refresh()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                print(f"Error checking player cache version: {e}")
+
+    def put(self, player: dict):
+        """Replace one cached player after a local write"""
+        previous = self.players.get(player["_id"])
+        if previous is not None:
+            for index, key in ((self.by_position, "position"), (self.by_team, "team")):
+                ids = index.get(previous.get(key), [])
+                if player["_id"] in ids:
+                    ids.remove(player["_id"])
+        self.players[player["_id"]] = player
+        self.by_position.setdefault(player.get("position"), []).append(player["_id"])
+        self.by_team.setdefault(player.get("team"), []).append(player["_id"])
+
+    def get(self, player_id) -> Optional[dict]:
+        return self.players.get(ObjectId(player_id))
+
+    def get_many(self, player_ids: Iterable) -> Dict[ObjectId, dict]:
+        """Cached players for the given ids; unknown ids and empty slots are skipped"""
+        found = {}
+        for player_id in player_ids:
+            if player_id is None or not ObjectId.is_valid(player_id):
+                continue
+            player = self.players.get(ObjectId(player_id))
+            if player is not None:
+                found[player["_id"]] = player
+        return found
+
+    def find(self, position: Optional[str] = None, team: Optional[str] = None) -> List[dict]:
+        """Players matching the filters, served from the secondary indexes"""
+        if position and team:
+            ids = self.by_position.get(position, [])
+            return [self.players[player_id] for player_id in ids if self.players[player_id].get("team") == team]
+        if position:
+            return [self.players[player_id] for player_id in self.by_position.get(position, [])]
+        if team:
+            return [self.players[player_id] for player_id in self.by_team.get(team, [])]
+        return list(self.players.values())
+
+    def cleanup(self):
+        """Cancel the background task"""
+        if self.watch_task:
+            self.watch_task.cancel()
+
+
+async def load_players(player_ids: List[ObjectId], view: str = "full") -> List[dict]:
+    """Players by id from the cache, or with one $in query projected to the view before it has loaded"""
+    cache = PlayerCache()
+    if cache.loaded:
+        return list(cache.get_many(player_ids).values())
+
+    db = get_database()
+    return await db.nflplayers.find({"_id": {"$in": list(player_ids)}}, player_projection(view)).to_list(None)
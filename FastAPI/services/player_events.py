@@ -0,0 +1,92 @@
+import asyncio
+import json
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional
+from utils.redis_client import get_redis, new_redis
+
+PLAYER_UPDATES_CHANNEL = "nflplayers:updates"
+LIVE_WEEK_CHANNEL = "matchups:live_week"
+CHANNELS = (PLAYER_UPDATES_CHANNEL, LIVE_WEEK_CHANNEL)
+
+async def publish_player_updates(week: int, changes: List[Dict], version: Optional[int] = None):
+    """Publish the players whose scores changed in a scrape; called from the scrape worker"""
+    client = new_redis()
+    event = {"id": uuid.uuid4().hex, "week": week, "players": changes, "version": version}
+    try:
+        await client.publish(PLAYER_UPDATES_CHANNEL, json.dumps(event))
+    except Exception as e:
+        print(f"Error publishing player updates: {e}")
+    finally:
+        await client.aclose()
+
+async def publish_live_week_change(live: bool) -> bool:
+    """Tell every API process that the week's matchups were activated (live) or finalized"""
+    try:
+        await get_redis().publish(LIVE_WEEK_CHANNEL, json.dumps({"live": live}))
+        return True
+    except Exception as e:
+        print(f"Error publishing live week change: {e}")
+        return False
+
+
+class PlayerEventListener:
+    """Subscribes to scrape and live week updates and fans each message out to registered handlers"""
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, 'initialized'):
+            self.handlers: Dict[str, List[Callable[[dict], Awaitable[None]]]] = {channel: [] for channel in CHANNELS}
+            self.listen_task: Optional[asyncio.Task] = None
+            self.initialized = True
+
+    def subscribe(self, handler: Callable[[dict], Awaitable[None]], channel: str = PLAYER_UPDATES_CHANNEL):
+        if handler not in self.handlers[channel]:
+            self.handlers[channel].append(handler)
+
+    async def initialize(self):
+        """Start listening for scrape updates"""
+        if self.listen_task is None or self.listen_task.done():
+            self.listen_task = asyncio.create_task(self._listen())
+        print("Player event listener initialized")
+
+    async def _listen(self):
+        while True:
+            pubsub = None
+            try:
+                pubsub = get_redis().pubsub()
+                await pubsub.subscribe(*CHANNELS)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    channel = message["channel"]
+                    if isinstance(channel, bytes):
+                        channel = channel.decode()
+                    await self._dispatch(channel, json.loads(message["data"]))
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                print(f"Error in player event listener: {e}")
+                await asyncio.sleep(30)  # Redis unavailable; retry later
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.aclose()
+                    except Exception:
+                        pass
+
+    async def _dispatch(self, channel: str, event: dict):
+        for handler in self.handlers.get(channel, []):
+            try:
+                await handler(event)
+            except Exception as e:
+                print(f"Error handling player update: {e}")
+
+    def cleanup(self):
+        """Cancel the background task"""
+        if self.listen_task:
+            self.listen_task.cancel()
@@ -0,0 +1,86 @@
+import asyncio
+import re
+import unicodedata
+from typing import Dict, Optional, Set
+from bson import ObjectId
+from utils.db import get_database
+from services.player_events import PlayerEventListener
+
+NGRAM_SIZE = 3
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace"""
+    decomposed = unicodedata.normalize("NFKD", name or "")
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char)).lower()
+    stripped = re.sub(r"[^a-z0-9\s]", "", stripped)
+    return " ".join(stripped.split())
+
+
+def _ngrams(text: str) -> Set[str]:
+    return {text[index:index + NGRAM_SIZE] for index in range(len(text) - NGRAM_SIZE + 1)}
+
+
+class PlayerSearchIndex:
+    """In-memory trigram index over normalized player names for substring search"""
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, 'initialized'):
+            self.names: Dict[ObjectId, str] = {}
+            self.ngrams: Dict[str, Set[ObjectId]] = {}
+            self.loaded = False
+            self.lock = asyncio.Lock()
+            self.initialized = True
+
+    async def initialize(self):
+        """Build the index and rebuild it whenever the scraper updates players"""
+        await self.rebuild()
+        PlayerEventListener().subscribe(self._on_player_updates)
+        print(f"Player search index built over {len(self.names)} players")
+
+    async def rebuild(self):
+        db = get_database()
+        async with self.lock:
+            names = {}
+            ngrams: Dict[str, Set[ObjectId]] = {}
+            async for player in db.nflplayers.find({}, {"name": 1}):
+                name = normalize_name(player.get("name", ""))
+                names[player["_id"]] = name
+                for ngram in _ngrams(name):
+                    ngrams.setdefault(ngram, set()).add(player["_id"])
+
+            # Swap in whole so searches never see a half-built index
+            self.names = names
+            self.ngrams = ngrams
+            self.loaded = True
+
+    async def _on_player_updates(self, event: dict):
+        await self.rebuild()
+
+    def match(self, query: str) -> Optional[Set[ObjectId]]:
+        """Ids of players whose name contains the query, or None if the index is not loaded"""
+        if not self.loaded:
+            return None
+
+        needle = normalize_name(query)
+        if not needle:
+            return set(self.names)
+
+        if len(needle) < NGRAM_SIZE:
+            candidates = self.names.keys()
+        else:
+            postings = sorted((self.ngrams.get(ngram, set()) for ngram in _ngrams(needle)), key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                candidates &= posting
+                if not candidates:
+                    return set()
+
+        # Trigrams can co-occur without being contiguous, so confirm the substring
+        return {player_id for player_id in candidates if needle in self.names[player_id]}
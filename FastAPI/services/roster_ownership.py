@@ -0,0 +1,232 @@
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from fastapi import HTTPException
+from pymongo import ASCENDING
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from typing import Iterable, List, Optional, Set, Tuple
+from bson import ObjectId
+from utils.db import get_database
+from utils.redis_client import get_redis
+from models.base import PyObjectId
+from services.player_cache import PlayerCache
+
+# One document per rostered player: {"league", "player", "team"}. The unique
+# (league, player) index makes double-rostering a player in a league impossible.
+OWNERSHIP_INDEX = [("league", ASCENDING), ("player", ASCENDING)]
+
+# Read-side copy of each league's ownership as a Redis bitmap over the player
+# cache's slot numbering. roster_ownership stays authoritative: bitmaps are
+# rebuilt from it when missing. Changes reach the bitmap only after their
+# transaction commits, and each one bumps the league's generation so a rebuild
+# that read ownership before the change cannot store its stale copy.
+BITMAP_PREFIX = "roster_bitmap"
+GENERATION_PREFIX = "roster_gen"
+BITMAP_TTL_SECONDS = 300
+GENERATION_TTL_SECONDS = 86400
+
+# Bump the generation, then flip a bit in the bitmap if it exists (never
+# creating a partial one), or drop the bitmap when the slot is -1
+APPLY_CHANGE = """
+redis.call('incr', KEYS[1])
+redis.call('expire', KEYS[1], ARGV[3])
+if tonumber(ARGV[1]) < 0 then
+    return redis.call('del', KEYS[2])
+end
+if redis.call('exists', KEYS[2]) == 1 then
+    return redis.call('setbit', KEYS[2], ARGV[1], ARGV[2])
+end
+return -1
+"""
+
+# Store a rebuilt bitmap only if no change landed since its generation was read
+STORE_IF_CURRENT = """
+if (redis.call('get', KEYS[1]) or '0') == ARGV[1] then
+    redis.call('set', KEYS[2], ARGV[2], 'EX', ARGV[3])
+    return 1
+end
+return 0
+"""
+
+# (league, player, owned) changes waiting for the surrounding transaction to
+# commit; a None player drops the league's bitmap
+_pending_changes: ContextVar[Optional[List[Tuple]]] = ContextVar("pending_ownership_changes", default=None)
+
+
+async def initialize_roster_ownership():
+    """Create the ownership indexes and backfill them from team rosters on first run"""
+    db = get_database()
+    await db.roster_ownership.create_index(OWNERSHIP_INDEX, unique=True, name="league_player_unique")
+    await db.roster_ownership.create_index([("team", ASCENDING)], name="team")
+
+    if await db.roster_ownership.estimated_document_count() > 0:
+        return
+
+    player_ids = set(await db.nflplayers.distinct("_id"))
+    entries = []
+    async for team in db.teams.find({}, {"league": 1, "roster": 1}):
+        for player_id in team.get("roster", []):
+            if player_id in player_ids:
+                entries.append({"league": team["league"], "player": player_id, "team": team["_id"]})
+
+    if entries:
+        try:
+            await db.roster_ownership.insert_many(entries, ordered=False)
+        except BulkWriteError as e:
+            print(f"Skipped {len(e.details.get('writeErrors', []))} double-rostered players while backfilling")
+    print(f"Backfilled {len(entries)} roster ownership entries")
+
+
+@asynccontextmanager
+async def ownership_transaction(session):
+    """session.start_transaction() that mirrors ownership changes to Redis once it commits"""
+    changes: List[Tuple] = []
+    token = _pending_changes.set(changes)
+    try:
+        async with session.start_transaction():
+            yield
+    finally:
+        _pending_changes.reset(token)
+    # Only reached when the transaction committed
+    for league_id, player_id, owned in changes:
+        await _apply_change(league_id, player_id, owned)
+
+
+async def _record_change(league_id, player_id, owned: bool):
+    changes = _pending_changes.get()
+    if changes is None:
+        await _apply_change(league_id, player_id, owned)
+    else:
+        changes.append((league_id, player_id, owned))
+
+
+async def claim_player(league_id, player_id, team_id, session=None):
+    """Record that a team rosters a player; fails if the player is already owned in the league"""
+    db = get_database()
+    try:
+        await db.roster_ownership.insert_one(
+            {"league": PyObjectId(league_id), "player": PyObjectId(player_id), "team": PyObjectId(team_id)},
+            session=session
+        )
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Player already drafted or picked up in this league")
+    await _record_change(league_id, player_id, True)
+
+
+async def release_player(league_id, player_id, session=None):
+    db = get_database()
+    await db.roster_ownership.delete_one(
+        {"league": PyObjectId(league_id), "player": PyObjectId(player_id)},
+        session=session
+    )
+    await _record_change(league_id, player_id, False)
+
+
+async def release_team(team_id, session=None):
+    db = get_database()
+    leagues = await db.roster_ownership.distinct("league", {"team": PyObjectId(team_id)}, session=session)
+    await db.roster_ownership.delete_many({"team": PyObjectId(team_id)}, session=session)
+    for league_id in leagues:
+        await _record_change(league_id, None, False)
+
+
+async def release_league(league_id, session=None):
+    db = get_database()
+    await db.roster_ownership.delete_many({"league": PyObjectId(league_id)}, session=session)
+    await _record_change(league_id, None, False)
+
+
+async def is_player_owned(league_id, player_id, session=None) -> bool:
+    """Single point lookup on the (league, player) index"""
+    db = get_database()
+    owner = await db.roster_ownership.find_one(
+        {"league": PyObjectId(league_id), "player": PyObjectId(player_id)},
+        {"_id": 0, "player": 1},
+        session=session
+    )
+    return owner is not None
+
+
+async def owned_player_ids(league_id, session=None) -> List[PyObjectId]:
+    """Every rostered player in a league, served as a covered index query"""
+    db = get_database()
+    cursor = db.roster_ownership.find(
+        {"league": PyObjectId(league_id)},
+        {"_id": 0, "player": 1},
+        session=session
+    )
+    return [entry["player"] async for entry in cursor]
+
+
+def _bitmap_key(league_id, version: int) -> str:
+    return f"{BITMAP_PREFIX}:{league_id}:v{version}"
+
+
+def _generation_key(league_id) -> str:
+    return f"{GENERATION_PREFIX}:{league_id}"
+
+
+def _encode_bitmap(player_ids: Iterable[ObjectId], slots: dict) -> bytes:
+    """Big-endian bit per slot, matching Redis SETBIT/GETBIT offsets"""
+    bits = bytearray(len(slots) // 8 + 1)
+    for player_id in player_ids:
+        slot = slots.get(player_id)
+        if slot is not None:
+            bits[slot >> 3] |= 0x80 >> (slot & 7)
+    return bytes(bits)
+
+
+def _decode_bitmap(bitmap: bytes, slot_ids: List[ObjectId]) -> Set[ObjectId]:
+    owned = set()
+    for index, byte in enumerate(bitmap):
+        if not byte:
+            continue
+        for bit in range(8):
+            slot = (index << 3) + bit
+            if byte & (0x80 >> bit) and slot < len(slot_ids):
+                owned.add(slot_ids[slot])
+    return owned
+
+
+async def _apply_change(league_id, player_id, owned: bool):
+    """Mirror one committed ownership change into the league's bitmap"""
+    cache = PlayerCache()
+    slot = cache.slots.get(PyObjectId(player_id)) if cache.loaded and player_id is not None else None
+    # Players without a slot cannot be flipped in place, so drop the bitmap for a rebuild
+    slot = -1 if slot is None else slot
+    try:
+        await get_redis().eval(
+            APPLY_CHANGE, 2, _generation_key(league_id), _bitmap_key(league_id, cache.version),
+            slot, int(owned), GENERATION_TTL_SECONDS
+        )
+    except Exception as e:
+        print(f"Could not update roster bitmap for league {league_id}: {e}")
+
+
+async def owned_player_set(league_id) -> Set[ObjectId]:
+    """Rostered players in a league from its bitmap, rebuilding the bitmap from roster_ownership if missing"""
+    cache = PlayerCache()
+    if not cache.loaded:
+        return set(await owned_player_ids(league_id))
+
+    # Read the numbering once so a concurrent refresh cannot mix two versions
+    version, slots, slot_ids = cache.version, cache.slots, cache.slot_ids
+    key, generation_key = _bitmap_key(league_id, version), _generation_key(league_id)
+    try:
+        bitmap, generation = await get_redis().mget(key, generation_key)
+    except Exception as e:
+        print(f"Roster bitmap unavailable, reading ownership from the database: {e}")
+        return set(await owned_player_ids(league_id))
+    if bitmap is not None:
+        return _decode_bitmap(bitmap, slot_ids)
+
+    # Read ownership after the generation, so any change committed meanwhile fails the store
+    owned = await owned_player_ids(league_id)
+    if all(player_id in slots for player_id in owned):
+        try:
+            await get_redis().eval(
+                STORE_IF_CURRENT, 2, generation_key, key,
+                generation.decode() if generation else "0", _encode_bitmap(owned, slots), BITMAP_TTL_SECONDS
+            )
+        except Exception as e:
+            print(f"Could not store roster bitmap for league {league_id}: {e}")
+    return set(owned)
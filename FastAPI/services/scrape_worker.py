@@ -1,4 +1,5 @@
 from celery import Celery
+from celery.signals import worker_process_init
 from celery.schedules import crontab
 import asyncio
 from services.data_scrape import DataScrapeManager
@@ -14,7 +15,8 @@ REDIS_URL = os.getenv('REDISCLOUD_URL', 'redis://localhost:6379/0')
 # Create Celery app
 app = Celery('fantasy_football_scraper',
              broker=REDIS_URL,
-             backend=REDIS_URL)
+             backend=REDIS_URL,
+             include=['services.week_tasks'])
 
 # Configure Celery
 app.conf.update(
@@ -26,19 +28,22 @@ app.conf.update(
     broker_connection_retry_on_startup=True
 )
 
+# The shared Motor client binds to the first loop that uses it, so every task
+# in a worker process runs on this one loop instead of a fresh one per task.
+worker_loop = None
+
+@worker_process_init.connect
+def init_worker_loop(**kwargs):
+    global worker_loop
+    worker_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(worker_loop)
+
 def run_async_task(coro):
-    """Helper function to run async code in a new event loop"""
-    try:
-        # Get the current event loop or create a new one
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        
-        return loop.run_until_complete(coro)
-    except Exception as e:
-        raise e
+    """Run a coroutine on the worker process's long-lived event loop"""
+    global worker_loop
+    if worker_loop is None or worker_loop.is_closed():
+        init_worker_loop()
+    return worker_loop.run_until_complete(coro)
 
 @app.task(name='scrape-every-5-minutes')
 def run_data_scrape():
@@ -46,21 +51,15 @@ def run_data_scrape():
     Task to execute the NFL data scrape
     """
     try:
-        # Create a new event loop for this task
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
         # Create a fresh manager instance for each task
         scrape_manager = DataScrapeManager()
             
         # Run initialization and scrape
-        result = loop.run_until_complete(scrape_manager.run_full_scrape())
+        result = run_async_task(scrape_manager.run_full_scrape())
             
         return {"status": "success", "message": "Data scrape completed successfully", "result": result}
     except Exception as e:
         return {"status": "error", "message": str(e)}
-    finally:
-        loop.close()
 
 # Schedule the task
 app.conf.beat_schedule = {
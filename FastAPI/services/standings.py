@@ -0,0 +1,221 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from pymongo import ReplaceOne
+from pymongo.errors import DuplicateKeyError
+from utils.db import get_database
+from models.base import PyObjectId
+
+# One document per league: {"_id": league, "week", "teams": [entry, ...],
+# "applied_matchups": [matchup id, ...], "updated_at"} with the entries kept in
+# rank order. Ties on win percentage are broken by head-to-head record among the
+# tied teams, then points for, then points against. applied_matchups lists every
+# matchup counted so far, so replaying a result never counts it twice.
+
+
+def _new_entry(team_id, name: str = "") -> dict:
+    return {
+        "team": team_id,
+        "name": name,
+        "rank": 0,
+        "wins": 0,
+        "losses": 0,
+        "ties": 0,
+        "win_pct": 0.0,
+        "points_for": 0.0,
+        "points_against": 0.0,
+        "streak": "",
+        "head_to_head": {}
+    }
+
+
+def _record(entry: dict, opponent_id, points_for: float, points_against: float):
+    """Add one finished game to a team's entry"""
+    if points_for > points_against:
+        outcome, net = "W", 1
+        entry["wins"] += 1
+    elif points_for < points_against:
+        outcome, net = "L", -1
+        entry["losses"] += 1
+    else:
+        outcome, net = "T", 0
+        entry["ties"] += 1
+
+    games = entry["wins"] + entry["losses"] + entry["ties"]
+    entry["win_pct"] = round((entry["wins"] + 0.5 * entry["ties"]) / games, 3)
+    entry["points_for"] = round(entry["points_for"] + points_for, 2)
+    entry["points_against"] = round(entry["points_against"] + points_against, 2)
+
+    streak = entry["streak"]
+    entry["streak"] = f"{outcome}{int(streak[1:]) + 1}" if streak and streak[0] == outcome else f"{outcome}1"
+
+    opponent = str(opponent_id)
+    entry["head_to_head"][opponent] = entry["head_to_head"].get(opponent, 0) + net
+
+
+def _rank(entries: List[dict]) -> List[dict]:
+    """Order entries by win percentage, breaking ties with the head-to-head chain"""
+    groups: Dict[float, List[dict]] = {}
+    for entry in entries:
+        groups.setdefault(entry["win_pct"], []).append(entry)
+
+    ranked = []
+    for win_pct in sorted(groups, reverse=True):
+        group = groups[win_pct]
+        tied = {str(entry["team"]) for entry in group}
+
+        def tiebreak(entry):
+            head_to_head = sum(net for opponent, net in entry["head_to_head"].items() if opponent in tied)
+            return (-head_to_head, -entry["points_for"], entry["points_against"], entry["name"])
+
+        ranked.extend(sorted(group, key=tiebreak))
+
+    for rank, entry in enumerate(ranked, start=1):
+        entry["rank"] = rank
+    return ranked
+
+
+def _document(league_id, week: int, entries: List[dict], applied: List) -> dict:
+    return {
+        "_id": league_id,
+        "week": week,
+        "teams": _rank(entries),
+        "applied_matchups": applied,
+        "updated_at": datetime.now(timezone.utc)
+    }
+
+
+async def _compute_standings(league_id, session=None) -> dict:
+    """A league's standings from its completed matchups, without saving them"""
+    db = get_database()
+
+    entries = {}
+    async for team in db.teams.find({"league": league_id}, {"name": 1}, session=session):
+        entries[team["_id"]] = _new_entry(team["_id"], team.get("name", ""))
+
+    week = 0
+    applied = []
+    cursor = db.matchups.find(
+        {"league": league_id, "status": "completed"},
+        {"week": 1, "team_a": 1, "team_b": 1, "team_a_score": 1, "team_b_score": 1},
+        session=session
+    ).sort("week", 1)
+    async for matchup in cursor:
+        team_a, team_b = PyObjectId(matchup["team_a"]), PyObjectId(matchup["team_b"])
+        if team_a not in entries or team_b not in entries:
+            continue  # BYE week
+        _record(entries[team_a], team_b, matchup["team_a_score"], matchup["team_b_score"])
+        _record(entries[team_b], team_a, matchup["team_b_score"], matchup["team_a_score"])
+        week = max(week, matchup["week"])
+        applied.append(matchup["_id"])
+
+    return _document(league_id, week, list(entries.values()), applied)
+
+
+async def rebuild_league_standings(league_id, session=None) -> dict:
+    """Recompute a league's standings from its completed matchups"""
+    db = get_database()
+    league_id = PyObjectId(league_id)
+    standings = await _compute_standings(league_id, session=session)
+    await db.standings.replace_one({"_id": league_id}, standings, upsert=True, session=session)
+    return standings
+
+
+async def apply_matchup_results(results: List[dict], session=None):
+    """Fold newly completed matchups into their leagues' standings documents
+
+    Each result is {"matchup", "league", "week", "team_a", "team_b", "team_a_score",
+    "team_b_score"}. Called after the matchups are written, so a league without a
+    standings document yet is rebuilt from scratch instead. Results already in a
+    league's applied_matchups are skipped.
+    """
+    if not results:
+        return
+
+    db = get_database()
+    by_league: Dict[PyObjectId, List[dict]] = {}
+    for result in results:
+        by_league.setdefault(PyObjectId(result["league"]), []).append(result)
+
+    existing = {
+        standings["_id"]: standings
+        async for standings in db.standings.find({"_id": {"$in": list(by_league)}}, session=session)
+    }
+
+    # Teams that enter the standings here get their names from the team documents
+    unknown = set()
+    for league_id, league_results in by_league.items():
+        standings = existing.get(league_id)
+        if standings is None:
+            continue
+        known = {entry["team"] for entry in standings["teams"]}
+        for result in league_results:
+            unknown.update({PyObjectId(result["team_a"]), PyObjectId(result["team_b"])} - known)
+    names = {}
+    if unknown:
+        async for team in db.teams.find({"_id": {"$in": list(unknown)}}, {"name": 1}, session=session):
+            names[team["_id"]] = team.get("name", "")
+
+    updates = []
+    for league_id, league_results in by_league.items():
+        standings = existing.get(league_id)
+        if standings is None:
+            await rebuild_league_standings(league_id, session=session)
+            continue
+
+        entries = {entry["team"]: entry for entry in standings["teams"]}
+        applied = list(standings.get("applied_matchups", []))
+        applied_ids = set(applied)
+        week = standings.get("week", 0)
+        for result in league_results:
+            if result["matchup"] in applied_ids:
+                continue
+            team_a, team_b = PyObjectId(result["team_a"]), PyObjectId(result["team_b"])
+            entry_a = entries.setdefault(team_a, _new_entry(team_a, names.get(team_a, "")))
+            entry_b = entries.setdefault(team_b, _new_entry(team_b, names.get(team_b, "")))
+            _record(entry_a, team_b, result["team_a_score"], result["team_b_score"])
+            _record(entry_b, team_a, result["team_b_score"], result["team_a_score"])
+            week = max(week, result["week"])
+            applied.append(result["matchup"])
+            applied_ids.add(result["matchup"])
+
+        if len(applied) == len(standings.get("applied_matchups", [])):
+            continue  # every result was a replay
+        updates.append(ReplaceOne({"_id": league_id}, _document(league_id, week, list(entries.values()), applied)))
+
+    if updates:
+        await db.standings.bulk_write(updates, ordered=False, session=session)
+
+
+async def get_league_standings(league_id) -> Optional[dict]:
+    """Read a league's standings, building them on first access; None if there is no such league"""
+    db = get_database()
+    league_id = PyObjectId(league_id)
+    standings = await db.standings.find_one({"_id": league_id})
+    if standings is not None:
+        return standings
+
+    if not await db.leagues.find_one({"_id": league_id}, {"_id": 1}):
+        return None
+
+    # Only fill the gap: a document written meanwhile by a matchup result wins
+    standings = await _compute_standings(league_id)
+    try:
+        await db.standings.insert_one(standings)
+    except DuplicateKeyError:
+        standings = await db.standings.find_one({"_id": league_id}) or standings
+    return standings
+
+
+async def invalidate_standings(league_id, session=None):
+    """Drop a league's standings so they are rebuilt on next read"""
+    db = get_database()
+    await db.standings.delete_one({"_id": PyObjectId(league_id)}, session=session)
+
+
+async def rename_team_standing(league_id, team_id, name: str):
+    """Keep a team's display name in its league standings current"""
+    db = get_database()
+    await db.standings.update_one(
+        {"_id": PyObjectId(league_id), "teams.team": PyObjectId(team_id)},
+        {"$set": {"teams.$.name": name}}
+    )
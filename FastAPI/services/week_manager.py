@@ -2,6 +2,7 @@ from datetime import datetime, time, timezone
 from typing import Tuple
 import asyncio
 from utils.db import get_database
+from utils.response_cache import invalidate_tags
 
 class WeekManager:
     def __init__(self):
@@ -36,6 +37,8 @@ class WeekManager:
             {},
             {"$set": {"week": new_week}}
         )
+        if result.modified_count:
+            await invalidate_tags("leagues")
         print(f"Updated {result.modified_count} leagues to week {new_week}")
 
     async def _check_week_transition(self):
@@ -0,0 +1,128 @@
+from celery import chord
+from datetime import datetime, timezone
+import asyncio
+import os
+from typing import List, Optional, Tuple
+from utils.db import get_database
+from services.scrape_worker import app, run_async_task
+
+WEEK_SHARD_COUNT = int(os.getenv("WEEK_SHARD_COUNT", "8"))
+WEEK_RUN_POLL_SECONDS = 5
+WEEK_RUN_STALL_SECONDS = 600  # give up on a run whose shards stop moving for this long
+WORKER_PING_SECONDS = 2
+
+
+def _ping_workers() -> int:
+    return len(app.control.ping(timeout=WORKER_PING_SECONDS) or [])
+
+
+async def plan_shards(shard_count: int = WEEK_SHARD_COUNT) -> List[Tuple[Optional[str], Optional[str]]]:
+    """Split leagues into contiguous _id ranges of roughly equal size"""
+    db = get_database()
+    league_count = await db.leagues.count_documents({})
+    shard_count = max(1, min(shard_count, league_count))
+    step = -(-league_count // shard_count)
+
+    # Each boundary is the first league _id of a shard, found by skipping along the _id index
+    boundaries: List[Optional[str]] = [None]
+    for index in range(1, shard_count):
+        league = await db.leagues.find({}, {"_id": 1}).sort("_id", 1).skip(index * step).limit(1).to_list(1)
+        if not league:
+            break
+        boundaries.append(str(league[0]["_id"]))
+    boundaries.append(None)
+
+    return [(boundaries[index], boundaries[index + 1]) for index in range(len(boundaries) - 1)]
+
+
+async def dispatch_week_job(run_id: str, job: str):
+    """Record a week run and fan its shards out to the workers, joined by a completion callback"""
+    db = get_database()
+    # A reachable broker with nobody consuming would leave the run queued forever
+    loop = asyncio.get_running_loop()
+    if not await loop.run_in_executor(None, _ping_workers):
+        raise RuntimeError("No Celery workers answered a ping")
+
+    shards = await plan_shards()
+
+    await db.week_runs.update_one(
+        {"_id": run_id},
+        {"$set": {
+            "job": job,
+            "status": "running",
+            "shards": [{"lower": lower, "upper": upper, "status": "pending"} for lower, upper in shards],
+            "completed_shards": 0,
+            "started_at": datetime.now(timezone.utc)
+        }},
+        upsert=True
+    )
+
+    workflow = chord(
+        [finalize_week_shard.s(run_id, job, index, lower, upper) for index, (lower, upper) in enumerate(shards)],
+        finalize_week_complete.s(run_id, job)
+    )
+    # Publishing to the broker is blocking, keep it off the event loop
+    await loop.run_in_executor(None, workflow.apply_async)
+    print(f"Dispatched {job} across {len(shards)} shards as {run_id}")
+
+
+async def wait_for_week_run(run_id: str, timeout: float):
+    """Wait for the workers to finish a week run; raises if it fails, stalls or times out"""
+    db = get_database()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    progress, moved_at = None, loop.time()
+    while loop.time() < deadline:
+        run = await db.week_runs.find_one({"_id": run_id}, {"status": 1, "error": 1, "shards.status": 1})
+        if run and run["status"] == "completed":
+            return
+        if run and run["status"] == "failed":
+            raise RuntimeError(f"Week run {run_id} failed: {run.get('error')}")
+
+        shard_statuses = [shard.get("status") for shard in run.get("shards", [])] if run else None
+        if shard_statuses != progress:
+            progress, moved_at = shard_statuses, loop.time()
+        elif loop.time() - moved_at > WEEK_RUN_STALL_SECONDS:
+            raise TimeoutError(f"Week run {run_id} made no progress in {WEEK_RUN_STALL_SECONDS} seconds")
+        await asyncio.sleep(WEEK_RUN_POLL_SECONDS)
+    raise TimeoutError(f"Week run {run_id} did not finish in {timeout} seconds")
+
+
+@app.task(name='finalize-week-shard')
+def finalize_week_shard(run_id: str, job: str, shard: int, lower: Optional[str], upper: Optional[str]):
+    """Activate or complete the matchups of the leagues in one _id range"""
+    from services.matchup_manager import MatchupManager
+
+    async def run():
+        db = get_database()
+        await db.week_runs.update_one({"_id": run_id}, {"$set": {f"shards.{shard}.status": "running"}})
+        try:
+            await MatchupManager().run_job_shard(job, (lower, upper))
+        except Exception as e:
+            await db.week_runs.update_one(
+                {"_id": run_id},
+                {"$set": {f"shards.{shard}.status": "failed", "status": "failed", "error": str(e)}}
+            )
+            raise
+        await db.week_runs.update_one(
+            {"_id": run_id},
+            {"$set": {f"shards.{shard}.status": "completed"}, "$inc": {"completed_shards": 1}}
+        )
+
+    run_async_task(run())
+    return {"shard": shard, "status": "completed"}
+
+
+@app.task(name='finalize-week-complete')
+def finalize_week_complete(results, run_id: str, job: str):
+    """Chord callback once every shard has finished"""
+
+    async def run():
+        db = get_database()
+        await db.week_runs.update_one(
+            {"_id": run_id},
+            {"$set": {"status": "completed", "completed_at": datetime.now(timezone.utc)}}
+        )
+
+    run_async_task(run())
+    return {"run": run_id, "job": job, "shards": len(results)}
@@ -0,0 +1,42 @@
+import os
+import sys
+
+# Never reach for the database in .env; every test gets an in-memory one
+os.environ["MONGODB_URL"] = "mongodb://localhost:27017"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mongomock
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from utils import db as db_module
+
+
+class _Session:
+    """Falsy stand-in for a client session; mongomock rejects any truthy session"""
+
+    def __bool__(self):
+        return False
+
+    def __await__(self):
+        if False:
+            yield
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def start_transaction(self):
+        return self
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(mongomock.MongoClient, "start_session", lambda self, *args, **kwargs: _Session(), raising=False)
+    client = AsyncMongoMockClient()
+    database = client.get_database("test")
+    monkeypatch.setattr(db_module, "client", client)
+    monkeypatch.setattr(db_module, "db", database)
+    return database
@@ -0,0 +1,61 @@
+from services.draft_board import DraftBoard, _Ranking
+
+
+def _players(count, position="RB"):
+    return [{"_id": f"p{index}", "name": f"Player {index}", "position": position, "projected_points": float(index)}
+            for index in range(count)]
+
+
+def test_ranking_head_is_best_available():
+    taken = set()
+    ranking = _Ranking([(-1.0, "a"), (-3.0, "c"), (-2.0, "b")], taken)
+    assert ranking.head() == (-3.0, "c")
+
+    taken.add("c")
+    ranking.discard()
+    assert ranking.head() == (-2.0, "b")
+    assert len(ranking) == 2
+
+
+def test_ranking_skips_taken_keys_left_in_place():
+    taken = set()
+    ranking = _Ranking([(-float(index), str(index)) for index in range(10)], taken)
+
+    taken.add("3")
+    ranking.discard()
+    assert [key[1] for key in ranking.available()] == ["9", "8", "7", "6", "5", "4", "2", "1", "0"]
+    assert len(ranking) == 9
+
+
+def test_ranking_compacts_once_half_the_keys_are_stale():
+    taken = set()
+    ranking = _Ranking([(-float(index), str(index)) for index in range(10)], taken)
+
+    for player_id in ("0", "1", "2", "3", "4", "5"):
+        taken.add(player_id)
+        ranking.discard()
+
+    assert ranking.stale == 0
+    assert [key[1] for key in ranking.keys] == ["6", "7", "8", "9"]
+    assert len(ranking) == 4
+
+
+def test_board_marks_taken_across_rankings():
+    board = DraftBoard(_players(5, "RB") + [{"_id": "qb", "name": "QB", "position": "QB", "projected_points": 2.5}])
+    assert board.best_available()["_id"] == "p4"
+
+    board.mark_taken("p4")
+    board.mark_taken("p4")  # repeated picks are ignored
+    assert board.best_available()["_id"] == "p3"
+    assert board.best_available(["QB"])["_id"] == "qb"
+    assert not board.is_available("p4")
+
+    players, total = board.page(0, 2)
+    assert [player["_id"] for player in players] == ["p3", "qb"]
+    assert total == 5
+
+
+def test_board_starts_with_taken_players_removed():
+    board = DraftBoard(_players(3), taken=["p2", None])
+    assert board.best_available()["_id"] == "p1"
+    assert board.page(0, 10)[1] == 2
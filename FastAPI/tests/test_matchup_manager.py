@@ -0,0 +1,98 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import pytest
+import services.matchup_manager as matchup_module
+from services.matchup_manager import ACTIVATE_JOB, COMPLETE_JOB, MatchupManager
+
+UTC = timezone.utc
+# A Wednesday: the last completion was Tuesday 6:00, the last activation the Thursday before
+WEDNESDAY = datetime(2024, 10, 2, 12, 0, tzinfo=UTC)
+
+
+def test_previous_deadline():
+    assert MatchupManager.previous_deadline(COMPLETE_JOB, WEDNESDAY) == datetime(2024, 10, 1, 6, 0, tzinfo=UTC)
+    assert MatchupManager.previous_deadline(ACTIVATE_JOB, WEDNESDAY) == datetime(2024, 9, 26, 19, 30, tzinfo=UTC)
+
+
+def test_previous_deadline_includes_the_exact_deadline():
+    deadline = datetime(2024, 10, 3, 19, 30, tzinfo=UTC)
+    assert MatchupManager.previous_deadline(ACTIVATE_JOB, deadline) == deadline
+    assert MatchupManager.previous_deadline(ACTIVATE_JOB, deadline - timedelta(seconds=1)) == deadline - timedelta(weeks=1)
+
+
+def test_next_deadline():
+    assert MatchupManager.next_deadline(WEDNESDAY) == (ACTIVATE_JOB, datetime(2024, 10, 3, 19, 30, tzinfo=UTC))
+
+
+@pytest.fixture
+def manager(db, monkeypatch):
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return WEDNESDAY
+
+    monkeypatch.setattr(matchup_module, "datetime", FrozenDatetime)
+    manager = MatchupManager()
+    calls = []
+    monkeypatch.setattr(manager, "db", db)
+    monkeypatch.setattr(manager, "calls", calls, raising=False)
+
+    async def run_until_done(job, deadline):
+        calls.append(("run", job, deadline))
+
+    async def skip_job(job, deadline):
+        calls.append(("skip", job, deadline))
+
+    monkeypatch.setattr(manager, "_run_until_done", run_until_done)
+    monkeypatch.setattr(manager, "_skip_job", skip_job)
+    return manager
+
+
+def test_first_run_records_latest_deadlines_without_running(manager):
+    asyncio.run(manager._catch_up())
+    assert sorted(manager.calls) == [
+        ("skip", ACTIVATE_JOB, datetime(2024, 9, 26, 19, 30, tzinfo=UTC)),
+        ("skip", COMPLETE_JOB, datetime(2024, 10, 1, 6, 0, tzinfo=UTC)),
+    ]
+
+
+def test_catch_up_runs_missed_deadlines_oldest_first(manager, db):
+    async def scenario():
+        await db.scheduled_jobs.insert_one({
+            "_id": "last", "job": COMPLETE_JOB, "status": "completed",
+            "deadline": datetime(2024, 9, 24, 6, 0, tzinfo=UTC)
+        })
+        await manager._catch_up()
+
+    asyncio.run(scenario())
+    # The activation's week has since been completed too, so it is skipped rather than replayed
+    assert manager.calls == [
+        ("skip", ACTIVATE_JOB, datetime(2024, 9, 26, 19, 30, tzinfo=UTC)),
+        ("run", COMPLETE_JOB, datetime(2024, 10, 1, 6, 0, tzinfo=UTC)),
+    ]
+
+
+def test_catch_up_does_nothing_when_up_to_date(manager, db):
+    async def scenario():
+        await db.scheduled_jobs.insert_one({
+            "_id": "last", "job": COMPLETE_JOB, "status": "completed",
+            "deadline": datetime(2024, 10, 1, 6, 0, tzinfo=UTC)
+        })
+        await manager._catch_up()
+
+    asyncio.run(scenario())
+    assert manager.calls == []
+
+
+def test_catch_up_goes_back_at_most_the_catch_up_window(manager, db):
+    async def scenario():
+        await db.scheduled_jobs.insert_one({
+            "_id": "last", "job": COMPLETE_JOB, "status": "skipped",
+            "deadline": datetime(2024, 1, 1, 6, 0, tzinfo=UTC)
+        })
+        await manager._catch_up()
+
+    asyncio.run(scenario())
+    oldest = min(deadline for _, _, deadline in manager.calls)
+    assert oldest >= WEDNESDAY - timedelta(weeks=matchup_module.JOB_CATCH_UP_WEEKS)
+    assert [action for action, job, _ in manager.calls if job == COMPLETE_JOB] == ["run"] * matchup_module.JOB_CATCH_UP_WEEKS
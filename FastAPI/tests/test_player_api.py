@@ -0,0 +1,32 @@
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+from api.player import _decode_cursor, _encode_cursor
+
+
+def test_cursor_round_trip():
+    player_id = ObjectId()
+    query = _decode_cursor(_encode_cursor({"_id": player_id, "projected_points": 12.5}))
+    assert query == {"$or": [
+        {"projected_points": {"$lt": 12.5}},
+        {"projected_points": None},
+        {"projected_points": 12.5, "_id": {"$gt": player_id}}
+    ]}
+
+
+def test_cursor_after_null_projection_only_seeks_ties():
+    player_id = ObjectId()
+    query = _decode_cursor(_encode_cursor({"_id": player_id, "projected_points": None}))
+    assert query == {"projected_points": None, "_id": {"$gt": player_id}}
+
+
+def test_cursor_is_url_safe():
+    cursor = _encode_cursor({"_id": ObjectId(), "projected_points": 99.99})
+    assert all(character.isalnum() or character in "-_=" for character in cursor)
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", "e30=", "eyJwIjogMSwgImkiOiAieCJ9"])
+def test_invalid_cursor_is_a_bad_request(cursor):
+    with pytest.raises(HTTPException) as error:
+        _decode_cursor(cursor)
+    assert error.value.status_code == 400
@@ -0,0 +1,30 @@
+from bson import ObjectId
+from services.roster_ownership import _decode_bitmap, _encode_bitmap
+
+
+def _numbering(count):
+    slot_ids = [ObjectId() for _ in range(count)]
+    return slot_ids, {player_id: slot for slot, player_id in enumerate(slot_ids)}
+
+
+def test_bitmap_round_trip():
+    slot_ids, slots = _numbering(20)
+    owned = {slot_ids[0], slot_ids[7], slot_ids[8], slot_ids[19]}
+    assert _decode_bitmap(_encode_bitmap(owned, slots), slot_ids) == owned
+
+
+def test_bitmap_matches_redis_bit_order():
+    slot_ids, slots = _numbering(16)
+    # SETBIT offset 0 is the high bit of the first byte
+    assert _encode_bitmap([slot_ids[0], slot_ids[9]], slots) == bytes([0x80, 0x40, 0x00])
+
+
+def test_bitmap_ignores_players_without_a_slot():
+    slot_ids, slots = _numbering(4)
+    assert _encode_bitmap([ObjectId()], slots) == bytes(1)
+
+
+def test_decode_ignores_bits_past_the_numbering():
+    slot_ids, _ = _numbering(3)
+    assert _decode_bitmap(bytes([0xFF]), slot_ids) == set(slot_ids)
+    assert _decode_bitmap(b"", slot_ids) == set()
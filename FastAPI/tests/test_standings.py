@@ -0,0 +1,66 @@
+import asyncio
+from bson import ObjectId
+from services.standings import _new_entry, _rank, _record, apply_matchup_results, rebuild_league_standings
+
+
+def _play(entries, team_a, team_b, score_a, score_b):
+    _record(entries[team_a], team_b, score_a, score_b)
+    _record(entries[team_b], team_a, score_b, score_a)
+
+
+def test_rank_orders_by_win_percentage():
+    teams = [ObjectId() for _ in range(3)]
+    entries = {team: _new_entry(team, name) for team, name in zip(teams, "ABC")}
+    _play(entries, teams[0], teams[1], 100, 90)
+    _play(entries, teams[0], teams[2], 100, 90)
+    _play(entries, teams[1], teams[2], 80, 80)
+
+    ranked = _rank(list(entries.values()))
+    assert [entry["name"] for entry in ranked] == ["A", "B", "C"]
+    assert [entry["rank"] for entry in ranked] == [1, 2, 3]
+    assert ranked[1]["win_pct"] == 0.25
+    assert ranked[1]["streak"] == "T1"
+
+
+def test_rank_breaks_ties_head_to_head_before_points():
+    teams = [ObjectId() for _ in range(4)]
+    entries = {team: _new_entry(team, name) for team, name in zip(teams, "ABCD")}
+    # A and B both go 1-1; B beat A, though A scored more overall
+    _play(entries, teams[1], teams[0], 91, 90)
+    _play(entries, teams[0], teams[2], 200, 10)
+    _play(entries, teams[3], teams[1], 100, 50)
+
+    ranked = _rank(list(entries.values()))
+    assert [entry["name"] for entry in ranked[:3]] == ["D", "B", "A"]
+
+
+def test_rank_falls_back_to_points_for_then_against():
+    teams = [ObjectId() for _ in range(2)]
+    entries = {team: _new_entry(team, name) for team, name in zip(teams, "AB")}
+    entries[teams[0]]["points_for"] = 50.0
+    entries[teams[1]]["points_for"] = 60.0
+
+    assert [entry["name"] for entry in _rank(list(entries.values()))] == ["B", "A"]
+
+
+def test_applying_results_is_idempotent(db):
+    league = ObjectId()
+    teams = [ObjectId(), ObjectId()]
+
+    async def scenario():
+        await db.teams.insert_many([{"_id": team, "league": league, "name": name} for team, name in zip(teams, "AB")])
+        await rebuild_league_standings(league)
+        result = {
+            "matchup": ObjectId(), "league": league, "week": 1,
+            "team_a": teams[0], "team_b": teams[1], "team_a_score": 110.0, "team_b_score": 95.5
+        }
+        await apply_matchup_results([result])
+        await apply_matchup_results([result])
+        return await db.standings.find_one({"_id": league})
+
+    standings = asyncio.run(scenario())
+    leader, trailer = standings["teams"]
+    assert (leader["name"], leader["wins"], leader["points_for"]) == ("A", 1, 110.0)
+    assert (trailer["name"], trailer["losses"]) == ("B", 1)
+    assert standings["week"] == 1
+    assert len(standings["applied_matchups"]) == 1
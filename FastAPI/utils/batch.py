@@ -0,0 +1,27 @@
+from fastapi import HTTPException, Query
+from bson import ObjectId
+from typing import Callable, List
+from models.base import PyObjectId
+
+BATCH_MAX_IDS = 200
+
+class BatchTooLargeError(ValueError):
+    pass
+
+def parse_object_ids(ids: str) -> List[ObjectId]:
+    """Unique ids from a comma-separated batch parameter, in request order"""
+    object_ids = list(dict.fromkeys(PyObjectId(part.strip()) for part in ids.split(",") if part.strip()))
+    if len(object_ids) > BATCH_MAX_IDS:
+        raise BatchTooLargeError(f"At most {BATCH_MAX_IDS} ids per batch")
+    return object_ids
+
+def batch_ids(kind: str) -> Callable[[str], List[ObjectId]]:
+    """Dependency parsing the ids query parameter of a batch route, with 400s for bad input"""
+    def dependency(ids: str = Query(...)) -> List[ObjectId]:
+        try:
+            return parse_object_ids(ids)
+        except BatchTooLargeError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception:
+            raise HTTPException(status_code=400, detail=f"Invalid {kind} ID format")
+    return dependency
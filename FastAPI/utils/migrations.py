@@ -0,0 +1,161 @@
+"""
+Versioned schema migrations.
+
+Each migration runs once per database and is recorded in the
+schema_migrations collection. They run at API startup, followed by a
+plan check that warns about hot queries falling back to collection scans,
+and can be run or verified by hand:
+
+    python -m utils.migrations
+    python -m utils.migrations --verify
+
+Migrations must be idempotent: two processes starting together may both
+apply a pending one before either records it.
+"""
+import argparse
+import asyncio
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Tuple
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+from utils.db import get_database
+from utils.roster_migration import migrate_roster_placeholders
+
+IndexSpec = List[Tuple[str, int]]
+
+
+def create_indexes(indexes: Dict[str, List[IndexSpec]]) -> Callable[[object], Awaitable[None]]:
+    """Migration step that creates the given indexes, keyed by collection"""
+    async def migrate(db):
+        for collection, specs in indexes.items():
+            for keys in specs:
+                await db[collection].create_index(keys)
+    return migrate
+
+
+async def _migrate_roster_placeholders(db):
+    await migrate_roster_placeholders()
+
+
+# (version, description, migration) in the order they must run; never edit an applied entry
+MIGRATIONS: List[Tuple[int, str, Callable[[object], Awaitable[None]]]] = [
+    (1, "Index hot query shapes", create_indexes({
+        "nflplayers": [
+            [("projected_points", DESCENDING), ("_id", ASCENDING)],
+            [("position", ASCENDING), ("projected_points", DESCENDING)],
+            [("team", ASCENDING), ("projected_points", DESCENDING)],
+            [("name", ASCENDING)],
+        ],
+        "teams": [
+            [("league", ASCENDING), ("roster", ASCENDING)],  # multikey over roster slots
+            [("owner", ASCENDING)],
+        ],
+        "matchups": [
+            [("status", ASCENDING), ("league", ASCENDING)],
+            [("league", ASCENDING), ("status", ASCENDING), ("week", ASCENDING)],
+        ],
+        "drafts": [
+            [("status", ASCENDING)],
+            [("league", ASCENDING)],
+        ],
+        "users": [
+            [("username", ASCENDING)],
+            [("email", ASCENDING)],
+            [("leagues", ASCENDING)],
+        ],
+        "scheduled_jobs": [
+            [("job", ASCENDING), ("deadline", DESCENDING)],
+        ],
+    })),
+    (2, "Null out roster placeholder ids", _migrate_roster_placeholders),
+]
+
+# (collection, filter, sort) of the queries that must be served by an index
+HOT_QUERIES = [
+    ("nflplayers", {}, [("projected_points", DESCENDING)]),
+    ("nflplayers", {"position": "QB"}, [("projected_points", DESCENDING)]),
+    ("nflplayers", {"team": "KC"}, [("projected_points", DESCENDING)]),
+    ("nflplayers", {"name": "Patrick Mahomes"}, None),
+    ("teams", {"league": ObjectId()}, None),
+    ("matchups", {"status": "started"}, None),
+    ("matchups", {"league": ObjectId(), "status": "completed"}, [("week", ASCENDING)]),
+    ("drafts", {"status": {"$in": ["started", "waiting"]}}, None),
+    ("users", {"$or": [{"username": "user"}, {"email": "user@example.com"}]}, None),
+    ("users", {"leagues": ObjectId()}, None),
+    ("roster_ownership", {"league": ObjectId()}, None),
+]
+
+
+async def run_migrations() -> int:
+    """Apply every migration not yet recorded; returns how many ran"""
+    db = get_database()
+    applied = {migration["_id"] async for migration in db.schema_migrations.find({}, {"_id": 1})}
+
+    ran = 0
+    for version, description, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+        print(f"Applying migration {version}: {description}")
+        await migrate(db)
+        await db.schema_migrations.update_one(
+            {"_id": version},
+            {"$set": {"description": description, "applied_at": datetime.now(timezone.utc)}},
+            upsert=True
+        )
+        ran += 1
+
+    print(f"Schema at version {MIGRATIONS[-1][0]} ({ran} migrations applied)")
+    return ran
+
+
+def _stages(plan) -> List[str]:
+    if isinstance(plan, dict):
+        stages = [plan["stage"]] if "stage" in plan else []
+        for value in plan.values():
+            stages.extend(_stages(value))
+        return stages
+    if isinstance(plan, list):
+        return [stage for item in plan for stage in _stages(item)]
+    return []
+
+
+async def verify_indexes(verbose: bool = True) -> List[str]:
+    """Explain every hot query and return the ones whose winning plan is a collection scan"""
+    db = get_database()
+    scans = []
+    for collection, query, sort in HOT_QUERIES:
+        find = {"find": collection, "filter": query}
+        if sort:
+            find["sort"] = dict(sort)
+        explain = await db.command({"explain": find, "verbosity": "queryPlanner"})
+        stages = _stages(explain["queryPlanner"]["winningPlan"])
+        label = f"{collection} {query}" + (f" sort {sort}" if sort else "")
+        if "COLLSCAN" in stages:
+            scans.append(label)
+            print(f"COLLSCAN  {label}")
+        elif verbose:
+            print(f"ok        {label}: {' <- '.join(stages)}")
+    return scans
+
+
+async def warn_on_collection_scans():
+    """Startup check: log hot queries without a usable index, never blocking startup"""
+    try:
+        scans = await verify_indexes(verbose=False)
+    except Exception as e:
+        print(f"Could not verify query plans: {e}")
+        return
+    if scans:
+        print(f"Warning: {len(scans)} hot queries scan whole collections; run python -m utils.migrations --verify")
+
+
+async def main(args):
+    await run_migrations()
+    if args.verify and await verify_indexes():
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations")
+    parser.add_argument("--verify", action="store_true", help="explain hot queries and fail on collection scans")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,26 @@
+import redis.asyncio as aioredis
+from dotenv import load_dotenv
+import os
+
+load_dotenv()
+
+REDIS_URL = os.getenv("REDISCLOUD_URL", os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+
+client = None
+
+def get_redis() -> aioredis.Redis:
+    """Shared async Redis client for the API process"""
+    global client
+    if client is None:
+        client = aioredis.from_url(REDIS_URL)
+    return client
+
+def new_redis() -> aioredis.Redis:
+    """Standalone client for short-lived event loops such as Celery tasks"""
+    return aioredis.from_url(REDIS_URL)
+
+async def close_redis():
+    global client
+    if client is not None:
+        await client.aclose()
+        client = None
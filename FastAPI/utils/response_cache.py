@@ -0,0 +1,244 @@
+"""
+Shared response cache for hot GET endpoints, stored in Redis so every
+uvicorn worker sees the same entries.
+
+Each cached route declares a TTL and the tags its response depends on.
+Mutation endpoints call invalidate_tags() with the entities they touched.
+Routes that embed player stats put the player cache version in their key,
+so a scrape retires those entries without explicit invalidation. Responses
+carry an ETag and matching If-None-Match requests get a 304.
+
+When Redis is unreachable the cache is bypassed for a short while and
+requests go straight to the endpoints. Afterwards a single request probes
+Redis while the rest keep bypassing, and invalidations skipped in the
+meantime are replayed once it answers.
+
+Every tag has a generation that invalidation bumps. A miss reads the
+generations of its tags before calling the endpoint and stores the response
+only if none moved, so a body read before a write is never cached after it.
+"""
+import hashlib
+import json
+import re
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+from utils.redis_client import get_redis
+from services.player_cache import PlayerCache
+
+RESPONSE_CACHE_PREFIX = "response"
+RESPONSE_CACHE_RETRY_SECONDS = 30
+RESPONSE_CACHE_PENDING_MAX = 1000  # skipped tags to remember before flushing everything instead
+TAG_GENERATION_TTL = 86400
+
+
+class CachedRoute:
+    def __init__(self, pattern: str, ttl: int, tags: Callable[[Dict[str, str]], List[str]], versioned: bool = False):
+        self.pattern = re.compile(pattern)
+        self.ttl = ttl
+        self.tags = tags
+        # Embeds player documents, so entries are keyed by the player cache version
+        self.versioned = versioned
+
+
+CACHED_ROUTES = [
+    CachedRoute(r"^/leagues/(?P<league>[0-9a-f]{24})$", 300, lambda ids: [f"league:{ids['league']}", "leagues"]),
+    # Live scores reach the page over the websocket, so a short TTL is enough for the rest
+    CachedRoute(r"^/leagues/(?P<league>[0-9a-f]{24})/dashboard$", 60, lambda ids: [f"league:{ids['league']}", "leagues", "teams", "matchups"], versioned=True),
+    CachedRoute(r"^/teams/(?P<team>[0-9a-f]{24})$", 300, lambda ids: [f"team:{ids['team']}", "teams"]),
+    CachedRoute(r"^/teams/roster/(?P<team>[0-9a-f]{24})$", 300, lambda ids: [f"team:{ids['team']}"], versioned=True),
+    CachedRoute(r"^/matchups/rosters/(?P<matchup>[0-9a-f]{24})$", 300, lambda ids: [f"matchup:{ids['matchup']}", "matchups"], versioned=True),
+    CachedRoute(r"^/drafts/picks/(?P<draft>[0-9a-f]{24})$", 60, lambda ids: [f"draft:{ids['draft']}"], versioned=True),
+]
+
+# Tag sets are shared between routes, so they must outlive the longest-lived
+# entry they point at; a shorter route must never cut their TTL.
+TAG_TTL = max(route.ttl for route in CACHED_ROUTES)
+
+# Store an entry and index it under its tags, unless a tag was invalidated
+# since its generation was read.
+# KEYS: entry, tag generations..., tag sets...
+# ARGV: tag count, body, ttl, tag set ttl, generations read...
+STORE_IF_CURRENT = """
+local count = tonumber(ARGV[1])
+for i = 1, count do
+    if (redis.call('get', KEYS[1 + i]) or '0') ~= ARGV[4 + i] then
+        return 0
+    end
+end
+redis.call('set', KEYS[1], ARGV[2], 'EX', ARGV[3])
+for i = 1, count do
+    redis.call('sadd', KEYS[1 + count + i], KEYS[1])
+    redis.call('expire', KEYS[1 + count + i], ARGV[4])
+end
+return 1
+"""
+
+_bypass_until = 0.0
+# Until Redis has answered (at startup and after a bypass), only one request at a
+# time talks to it, so an outage costs one connect timeout instead of one per request
+_recovering = True
+_probing = False
+# Invalidations skipped while bypassing, replayed on recovery
+_pending_tags: Set[str] = set()
+_flush_all = False
+
+
+def _redis():
+    """The shared client, or None while Redis is considered down or being probed"""
+    global _probing
+    if time.monotonic() < _bypass_until:
+        return None
+    if _recovering:
+        if _probing:
+            return None
+        _probing = True
+    return get_redis()
+
+
+def _mark_down(error: Exception):
+    global _bypass_until, _recovering, _probing
+    _bypass_until = time.monotonic() + RESPONSE_CACHE_RETRY_SECONDS
+    _recovering, _probing = True, False
+    print(f"Response cache unavailable, bypassing for {RESPONSE_CACHE_RETRY_SECONDS}s: {error}")
+
+
+async def _mark_up(client):
+    """Redis answered: let every request use it again, after replaying skipped invalidations"""
+    global _recovering, _probing, _flush_all
+    if not _recovering:
+        return
+    if _flush_all:
+        keys = [key async for key in client.scan_iter(match=f"{RESPONSE_CACHE_PREFIX}:*")]
+        if keys:
+            await client.delete(*keys)
+    elif _pending_tags:
+        await _invalidate(client, list(_pending_tags))
+    _pending_tags.clear()
+    _flush_all = False
+    _recovering, _probing = False, False
+
+
+def _release_probe():
+    """A probing request ended without reaching Redis"""
+    global _probing
+    if _recovering:
+        _probing = False
+
+
+def _defer(tags):
+    global _flush_all
+    if _flush_all:
+        return
+    _pending_tags.update(tags)
+    if len(_pending_tags) > RESPONSE_CACHE_PENDING_MAX:
+        _pending_tags.clear()
+        _flush_all = True
+
+
+def _tag_key(tag: str) -> str:
+    return f"{RESPONSE_CACHE_PREFIX}:tag:{tag}"
+
+
+def _generation_key(tag: str) -> str:
+    return f"{RESPONSE_CACHE_PREFIX}:gen:{tag}"
+
+
+async def _invalidate(client, tags: List[str]):
+    keys = []
+    for tag in tags:
+        keys.extend(await client.smembers(_tag_key(tag)))
+    async with client.pipeline(transaction=False) as pipe:
+        for tag in tags:
+            pipe.incr(_generation_key(tag))
+            pipe.expire(_generation_key(tag), TAG_GENERATION_TTL)
+        pipe.delete(*keys, *(_tag_key(tag) for tag in tags))
+        await pipe.execute()
+
+
+async def invalidate_tags(*tags: str):
+    """Drop every cached response that depends on any of the given tags"""
+    if not tags:
+        return
+    client = _redis()
+    if client is None:
+        _defer(tags)
+        return
+    try:
+        await _mark_up(client)
+        await _invalidate(client, list(tags))
+    except Exception as e:
+        _defer(tags)
+        _mark_down(e)
+
+
+def _match(path: str) -> Optional[Tuple[CachedRoute, Dict[str, str]]]:
+    for route in CACHED_ROUTES:
+        match = route.pattern.match(path)
+        if match:
+            return route, match.groupdict()
+    return None
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    return etag in [value.strip() for value in request.headers.get("if-none-match", "").split(",")]
+
+
+class ResponseCacheMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        matched = _match(request.url.path) if request.method == "GET" else None
+        client = _redis() if matched else None
+        if client is None:
+            return await call_next(request)
+
+        route, ids = matched
+        key = f"{RESPONSE_CACHE_PREFIX}:{request.url.path}?{request.url.query}"
+        if route.versioned:
+            key = f"{key}#v{PlayerCache().version}"
+        tags = route.tags(ids)
+
+        try:
+            await _mark_up(client)
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.get(key)
+                pipe.mget([_generation_key(tag) for tag in tags])
+                cached, generations = await pipe.execute()
+        except Exception as e:
+            _mark_down(e)
+            return await call_next(request)
+
+        if cached is not None:
+            entry = json.loads(cached)
+            headers = {"ETag": entry["etag"], "X-Cache": "HIT"}
+            if _not_modified(request, entry["etag"]):
+                return Response(status_code=304, headers=headers)
+            return Response(content=entry["body"].encode(), media_type="application/json", headers=headers)
+
+        try:
+            response = await call_next(request)
+        finally:
+            _release_probe()
+        if response.status_code != 200:
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        headers = {k: v for k, v in response.headers.items() if k.lower() != "content-length"}
+        headers.update({"ETag": etag, "X-Cache": "MISS"})
+
+        try:
+            await client.eval(
+                STORE_IF_CURRENT,
+                1 + 2 * len(tags),
+                key, *(_generation_key(tag) for tag in tags), *(_tag_key(tag) for tag in tags),
+                len(tags), json.dumps({"etag": etag, "body": body.decode()}), route.ttl, TAG_TTL,
+                *((generation or b"0").decode() for generation in generations)
+            )
+        except Exception as e:
+            _mark_down(e)
+
+        if _not_modified(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        return Response(content=body, status_code=200, headers=headers, media_type=response.media_type)
@@ -0,0 +1,58 @@
+"""
+Rewrite legacy roster placeholders as nulls.
+
+Teams and matchups used to fill empty roster slots with freshly minted
+ObjectIds. Any slot that does not reference a real nflplayers document is
+set to None, and rosters are padded to ROSTER_SIZE. Safe to re-run.
+
+    python -m utils.roster_migration
+"""
+import asyncio
+from typing import List, Optional, Set
+from pymongo import UpdateOne
+from utils.db import get_database
+from models.team import ROSTER_SIZE
+
+MIGRATION_BATCH_SIZE = 1000
+
+
+def normalize_roster(roster: Optional[list], player_ids: Set) -> List:
+    slots = [player_id if player_id in player_ids else None for player_id in (roster or [])]
+    return slots + [None] * (ROSTER_SIZE - len(slots))
+
+
+async def _migrate_collection(collection, fields: List[str], player_ids: Set) -> int:
+    updated = 0
+    batch = []
+    async for document in collection.find({}, {field: 1 for field in fields}).batch_size(MIGRATION_BATCH_SIZE):
+        changes = {}
+        for field in fields:
+            roster = normalize_roster(document.get(field), player_ids)
+            if roster != document.get(field):
+                changes[field] = roster
+        if changes:
+            batch.append(UpdateOne({"_id": document["_id"]}, {"$set": changes}))
+
+        if len(batch) >= MIGRATION_BATCH_SIZE:
+            await collection.bulk_write(batch, ordered=False)
+            updated += len(batch)
+            batch = []
+
+    if batch:
+        await collection.bulk_write(batch, ordered=False)
+        updated += len(batch)
+    return updated
+
+
+async def migrate_roster_placeholders():
+    """Null out placeholder ids in team and matchup rosters"""
+    db = get_database()
+    player_ids = set(await db.nflplayers.distinct("_id"))
+
+    teams = await _migrate_collection(db.teams, ["roster"], player_ids)
+    matchups = await _migrate_collection(db.matchups, ["team_a_roster", "team_b_roster"], player_ids)
+    print(f"Migrated roster placeholders on {teams} teams and {matchups} matchups")
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate_roster_placeholders())
@@ -0,0 +1,35 @@
+"""
+Fast JSON responses backed by orjson.
+
+FastResponse is the app's default response class. It encodes datetime
+natively and ObjectId values as strings, so responses skip the json.dumps
+pass. Route response models still validate and document the schema.
+
+trusted() skips response model validation as well. Use it only for
+documents read straight from our own collections, or shaped from them,
+whose layout the models already describe.
+"""
+from typing import Any
+import orjson
+from bson import ObjectId
+from fastapi.responses import ORJSONResponse
+
+
+def _default(value: Any):
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastResponse(ORJSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def trusted(content: Any, status_code: int = 200) -> FastResponse:
+    """Serialize our own documents as they are, without response model validation"""
+    return FastResponse(content=content, status_code=status_code)
@@ -47,7 +47,7 @@ function DraftMyTeam({ teamId, refreshTrigger }) {
       try {
         const teamResponse = await api.get(`/teams/${teamId}`, { headers: { Authorization: `Bearer ${token}` } });
         setTeam(teamResponse.data);
-        const rosterResponse = await api.get(`/teams/roster/${teamId}`, { headers: { Authorization: `Bearer ${token}` } });
+        const rosterResponse = await api.get(`/teams/roster/${teamId}`, { headers: { Authorization: `Bearer ${token}` }, params: { view: 'roster' } });
 
         setRoster(rosterResponse.data);
         setLoading(false);
@@ -200,14 +200,13 @@ function DraftPlayers({ onPlayerAdded, websocket }) {
 
     try {
       const [playersResponse, userResponse, leagueResponse] = await Promise.all([
-        api.get(`/nfl-players-paginated/${leagueIdParam}`, {
+        api.get(`/leagues/${leagueIdParam}/draft-board`, {
           headers: { Authorization: `Bearer ${token}` },
           params: { 
             page: currentPage, 
             limit: playersPerPage,
             position: positionFilter || undefined,
-            name: nameFilter || undefined,
-            available_in_league: leagueIdParam || undefined
+            name: nameFilter || undefined
           }
         }),
         api.get('/users/me/', { headers: { Authorization: `Bearer ${token}` } }),
@@ -621,7 +620,8 @@ const DraftPickTracker = ({ draft, websocket }) => {
 
         const playerPromises = draft.pick_list.map(playerId =>
           playerId ? api.get(`/nfl-players/${playerId}`, { 
-            headers: { Authorization: `Bearer ${token}` } 
+            headers: { Authorization: `Bearer ${token}` },
+            params: { view: 'summary' }
           }) : Promise.resolve({ data: null })
         );
         const playerResponses = await Promise.all(playerPromises);
@@ -653,7 +653,8 @@ const DraftPickTracker = ({ draft, websocket }) => {
         const token = localStorage.getItem('token');
         try {
           const playerResponse = await api.get(`/nfl-players/${data.player_id}`, {
-            headers: { Authorization: `Bearer ${token}` }
+            headers: { Authorization: `Bearer ${token}` },
+            params: { view: 'summary' }
           });
           
           setDraftedPlayers(prev => [...prev, playerResponse.data]);
@@ -998,7 +999,8 @@ const DraftResults = ({ draft, teams }) => {
 
         // Fetch all draft picks in a single request
         const picksResponse = await api.get(`/drafts/picks/${draft._id}`, {
-          headers: { Authorization: `Bearer ${token}` }
+          headers: { Authorization: `Bearer ${token}` },
+          params: { view: 'summary' }
         });
         
         const players = picksResponse.data;
@@ -1160,7 +1162,12 @@ function DraftHome() {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [ws, setWs] = useState(null);
+  const [resyncCount, setResyncCount] = useState(0);
   const wsRef = useRef(null);
+  const reconnectRef = useRef(null);
+  // Last draft event applied, so a reconnect can ask the server for what was missed
+  const lastSeqRef = useRef(null);
+  const epochRef = useRef(null);
   const location = useLocation();
 
   const handlePlayerDrafted = useCallback((data) => {
@@ -1239,6 +1246,7 @@ function DraftHome() {
 
   useEffect(() => {
     const setupWebSocket = (leagueId) => {
+      clearTimeout(reconnectRef.current);
       // Close existing connection if any
       if (wsRef.current) {
         wsRef.current.close();
@@ -1256,7 +1264,43 @@ function DraftHome() {
 
       socket.onmessage = (event) => {
         const data = JSON.parse(event.data);
+        if (data.type === 'ping') {
+          socket.send(JSON.stringify({ type: 'pong' }));
+          return;
+        }
         console.log(data);
+        if (data.type === 'sync') {
+          // Sent on connect: ask for anything published while we were away
+          const behind = epochRef.current !== data.epoch || lastSeqRef.current < data.seq;
+          if (lastSeqRef.current !== null && behind) {
+            socket.send(JSON.stringify({
+              type: 'resync',
+              last_seq: lastSeqRef.current,
+              epoch: epochRef.current
+            }));
+          } else {
+            lastSeqRef.current = data.seq;
+            epochRef.current = data.epoch;
+          }
+          return;
+        }
+        if (data.type === 'snapshot') {
+          // Too far behind to replay: take the server's state and remount the board
+          lastSeqRef.current = data.seq;
+          epochRef.current = data.epoch;
+          if (data.draft) {
+            setDraft(prevDraft => ({ ...prevDraft, ...data.draft }));
+            setShowDraftResults(data.draft.status === 'completed');
+          }
+          setResyncCount(prev => prev + 1);
+          setPlayerAdded(prev => !prev);
+          return;
+        }
+        if (typeof data.seq === 'number') {
+          if (data.epoch === epochRef.current && data.seq <= lastSeqRef.current) return;
+          lastSeqRef.current = data.seq;
+          epochRef.current = data.epoch;
+        }
         if (data.type === 'player_drafted' || data.type === 'draft_started') {
           handlePlayerDrafted(data);
         }
@@ -1267,15 +1311,14 @@ function DraftHome() {
         if (wsRef.current === socket) {
           wsRef.current = null;
           setWs(null);
+          // Dropped rather than closed by us: reconnect and resync
+          reconnectRef.current = setTimeout(() => setupWebSocket(leagueId), 2000);
         }
       };
 
       socket.onerror = (error) => {
+        // onclose follows and takes care of reconnecting
         console.error('WebSocket Error:', error);
-        if (wsRef.current === socket) {
-          wsRef.current = null;
-          setWs(null);
-        }
       };
     };
 
@@ -1334,6 +1377,7 @@ function DraftHome() {
 
     // Cleanup function
     return () => {
+      clearTimeout(reconnectRef.current);
       if (wsRef.current) {
         console.log('Cleaning up WebSocket connection');
         wsRef.current.close();
@@ -1383,13 +1427,13 @@ function DraftHome() {
       ) : (
         <>
           <div className="fixed top-0 left-0 right-0 z-50 md:left-36">
-            {draft && league && <DraftPickTracker draft={draft} websocket={ws} />}
+            {draft && league && <DraftPickTracker draft={draft} websocket={ws} key={resyncCount} />}
           </div>
           <div className="mt-36 md:mt-40">
             <div className="flex flex-col xl:flex-row h-auto xl:h-5/6 gap-4">
               <div className="w-auto xl:w-3/5 overflow-hidden">
                 <div className="md:max-h-[calc(81vh)] overflow-y-auto">
-                <DraftPlayers onPlayerAdded={handlePlayerAdded} websocket={ws} />
+                <DraftPlayers onPlayerAdded={handlePlayerAdded} websocket={ws} key={resyncCount} />
               </div>
             </div>
             <div id="team-section" className="w-auto xl:w-2/5 overflow-hidden flex flex-col">
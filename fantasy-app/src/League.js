@@ -10,6 +10,14 @@ const tokenUtil = {
   removeToken: () => localStorage.removeItem('token'),
 };
 
+const getWebSocketUrl = () => {
+  const isLocal = window.location.hostname === 'localhost' || 
+                  window.location.hostname === '127.0.0.1';
+  return isLocal 
+    ? 'ws://localhost:8000'
+    : 'wss://chaos-ff-api-62fa41b772fd.herokuapp.com';
+};
+
 const POSITION_MAPPING = {
   "QB": [0],
   "RB": [1, 2],
@@ -312,27 +320,25 @@ function LeagueHome() {
           return;
         }
 
-        // Fetch team data and owner data for each team
-        const teamsWithData = await Promise.all(leagueData.teams.map(async (teamId) => {
-          const teamResponse = await api.get(`/teams/${teamId}`, {
-            headers: { Authorization: `Bearer ${token}` }
-          });
-          const teamData = teamResponse.data;
-          
-          const ownerResponse = await api.get(`/users/${teamData.owner}`, {
-            headers: { Authorization: `Bearer ${token}` }
-          });
-          
-          return {
-            ...teamData,
-            ownerData: ownerResponse.data
-          };
-        }));
-
-        const commissionerResponse = await api.get(`/users/${leagueData.commissioner}`, {
-          headers: { Authorization: `Bearer ${token}` }
+        // Fetch every team, then every owner and the commissioner, in one request each
+        const teamsResponse = await api.get('/teams:batch', {
+          headers: { Authorization: `Bearer ${token}` },
+          params: { ids: leagueData.teams.join(',') }
+        });
+        const teamsById = teamsResponse.data;
+        const userIds = new Set(Object.values(teamsById).map(team => team.owner));
+        userIds.add(leagueData.commissioner);
+        const usersResponse = await api.get('/users:batch', {
+          headers: { Authorization: `Bearer ${token}` },
+          params: { ids: Array.from(userIds).join(',') }
         });
-        const commissionerData = commissionerResponse.data;
+        const usersById = usersResponse.data;
+
+        const teamsWithData = leagueData.teams.map(teamId => ({
+          ...teamsById[teamId],
+          ownerData: usersById[teamsById[teamId].owner]
+        }));
+        const commissionerData = usersById[leagueData.commissioner];
 
         setLeague({ ...leagueData, teams: teamsWithData, draftStatus: draftStatus });
         setCommissioner(commissionerData);
@@ -745,7 +751,8 @@ function LeaguePlayers() {
               limit: playersPerPage,
               position: positionFilter || undefined,
               name: nameFilter || undefined,
-              available_in_league: statusFilter ? leagueIdParam : undefined || undefined
+              available_in_league: statusFilter ? leagueIdParam : undefined || undefined,
+              view: 'roster'
             }
           }, { headers: { Authorization: `Bearer ${token}` } }),
           api.get('/users/me/', { headers: { Authorization: `Bearer ${token}` } }),
@@ -1156,26 +1163,27 @@ function LeagueScoreboard() {
       try {
         setLoading(true);
         const weekMatchupIds = league.schedule[selectedWeek - 1] || [];
-        const matchupPromises = weekMatchupIds.map(matchupId =>
-          api.get(`/matchup/${matchupId}`, {
-            headers: { Authorization: `Bearer ${token}` }
-          })
-        );
-        const matchupResponses = await Promise.all(matchupPromises);
-        const weekMatchups = matchupResponses.map(response => response.data);
+        if (weekMatchupIds.length === 0) {
+          setMatchups([]);
+          setTeams({});
+          setLoading(false);
+          return;
+        }
+        const matchupsResponse = await api.get('/matchups:batch', {
+          headers: { Authorization: `Bearer ${token}` },
+          params: { ids: weekMatchupIds.join(',') }
+        });
+        const weekMatchups = weekMatchupIds
+          .map(matchupId => matchupsResponse.data[matchupId])
+          .filter(Boolean);
         setMatchups(weekMatchups);
 
         const teamIds = new Set(weekMatchups.flatMap(m => [m.team_a, m.team_b]));
-        const teamPromises = Array.from(teamIds).map(teamId =>
-          api.get(`/teams/${teamId}`, {
-            headers: { Authorization: `Bearer ${token}` }
-          })
-        );
-        const teamResponses = await Promise.all(teamPromises);
-        const teamsData = Object.fromEntries(
-          teamResponses.map(response => [response.data._id, response.data])
-        );
-        setTeams(teamsData);
+        const teamsResponse = await api.get('/teams:batch', {
+          headers: { Authorization: `Bearer ${token}` },
+          params: { ids: Array.from(teamIds).join(',') }
+        });
+        setTeams(teamsResponse.data);
         setLoading(false);
       } catch (error) {
         setLoading(false);
@@ -1191,6 +1199,52 @@ function LeagueScoreboard() {
     fetchWeekData();
   }, [league, selectedWeek, navigate, location]);
 
+  // Live scores for the week's started matchups
+  useEffect(() => {
+    if (!league) return;
+
+    let socket = null;
+    let reconnectTimer = null;
+    let closed = false;
+
+    const applyScores = (scores) => {
+      const byId = {};
+      scores.forEach(score => { byId[score.matchup_id] = score; });
+      setMatchups(prev => prev.map(matchup => byId[matchup._id]
+        ? { ...matchup, team_a_score: byId[matchup._id].team_a_score, team_b_score: byId[matchup._id].team_b_score }
+        : matchup
+      ));
+    };
+
+    const connect = () => {
+      socket = new WebSocket(`${getWebSocketUrl()}/ws/matchups/${league._id}`);
+
+      socket.onmessage = (event) => {
+        const data = JSON.parse(event.data);
+        if (data.type === 'ping') {
+          socket.send(JSON.stringify({ type: 'pong' }));
+        }
+        else if (data.type === 'scores' || data.type === 'score_update') {
+          applyScores(data.matchups);
+        }
+      };
+
+      socket.onclose = () => {
+        if (!closed) {
+          reconnectTimer = setTimeout(connect, 5000);
+        }
+      };
+    };
+
+    connect();
+
+    return () => {
+      closed = true;
+      clearTimeout(reconnectTimer);
+      if (socket) socket.close();
+    };
+  }, [league]);
+
   const getTeamStyle = (matchup, teamId) => {
     if (matchup.status !== 'completed' || !matchup.winner || matchup.winner === 'BYE') {
       return 'text-gray-700';
@@ -1400,7 +1454,8 @@ function LeagueMatchup() {
             headers: { Authorization: `Bearer ${token}` }
           }),
           api.get(`/matchups/rosters/${matchupId}`, {
-            headers: { Authorization: `Bearer ${token}` }
+            headers: { Authorization: `Bearer ${token}` },
+            params: { view: 'roster' }
           })
         ]);
         setTeamAName(teamAResponse.data.name);
@@ -1701,22 +1756,18 @@ function LeagueStandings() {
         });
         setLeague(leagueResponse.data);
 
-        const teamPromises = leagueResponse.data.teams.map(teamId =>
-          api.get(`/teams/${teamId}`, {
-            headers: { Authorization: `Bearer ${token}` }
-          })
-        );
-        const teamResponses = await Promise.all(teamPromises);
-        const teamsData = teamResponses.map(response => response.data);
+        const standingsResponse = await api.get(`/leagues/${leagueId}/standings`, {
+          headers: { Authorization: `Bearer ${token}` }
+        });
 
-        const sortedTeams = teamsData
-          .map(team => ({
-            ...team,
-            winPercentage: team.wins / (team.wins + team.losses) || 0
-          }))
-          .sort((a, b) => b.winPercentage - a.winPercentage);
+        // Standings arrive already ranked
+        const rankedTeams = standingsResponse.data.teams.map(entry => ({
+          ...entry,
+          _id: entry.team,
+          winPercentage: entry.win_pct
+        }));
 
-        setTeams(sortedTeams);
+        setTeams(rankedTeams);
         setLoading(false);
       } catch (error) {
         console.error('Error fetching data:', error);
@@ -1885,7 +1936,7 @@ function LeagueMyTeam() {
         const ownerResponse = await api.get(`/users/${teamResponse.data.owner}`, { headers: { Authorization: `Bearer ${token}` } });
         setTeamOwner(ownerResponse.data);
 
-        const rosterResponse = await api.get(`/teams/roster/${teamId}`, { headers: { Authorization: `Bearer ${token}` } });
+        const rosterResponse = await api.get(`/teams/roster/${teamId}`, { headers: { Authorization: `Bearer ${token}` }, params: { view: 'roster' } });
 
         setRoster(rosterResponse.data);
         setLoading(false);